@@ -0,0 +1,214 @@
+"""Minimización por lotes desde la línea de comandos.
+
+Uso: python -m automatons [-j N] [-a ALGORITMO] [--refine-workers N] [--memory-limit MiB] [--labels FICHERO] [-f FORMATO [-o DIR]] [--cache DIR] [--nfa MÉTODO] [--compress-alphabet] [--stats] RUTA [RUTA ...]
+
+Cada RUTA puede ser un fichero, un patrón glob o un directorio (se recorre
+buscando ficheros .jff y .afdb). Los ficheros se minimizan en paralelo y los
+resultados se muestran según terminan. Con -f se escribe además cada autómata
+mínimo en el formato indicado, en la salida estándar o, con -o, en un fichero
+por entrada dentro de DIR. Con --stats se muestran los tiempos por fase y los
+contadores de cada minimización. Con --nfa los ficheros .jff se leen como
+autómatas no deterministas (jflap.Afn) y se determinizan con el método indicado.
+Con --compress-alphabet los símbolos que se comportan igual en todos los estados
+se agrupan en una sola columna, que se escribe como un rango. Con -a
+moore-parallel cada minimización reparte además sus rondas entre
+--refine-workers procesos (por defecto, las CPU entre los procesos de -j).
+Con --memory-limit se usa en lugar de -a el algoritmo de Moore por trozos, con
+la partición en ficheros proyectados en memoria (automatons.out_of_core); para
+que la tabla de transiciones tampoco esté en memoria, la entrada tiene que ser
+un fichero .afdb. Los estados con etiqueta de salida (el elemento <label> de
+JFLAP o, con --labels, un JSON que da la etiqueta de cada estado por nombre) solo
+se juntan con estados de su misma etiqueta: una sola minimización da el
+autómata mínimo de un analizador léxico con varios tokens.
+"""
+import argparse
+import glob
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from jflap.Afd import Afd
+from jflap.Afn import Afn
+from .auxiliar_classes.complete_afd import CompleteAFD
+from .binary_format import BINARY_EXTENSION, load_binary
+from .cache import DEFAULT_MAX_BYTES, PartitionCache
+from .determinize import METHODS, determinize
+from .minimize import compile_automaton, minimize_compiled
+from .out_of_core import minimize_out_of_core
+from .stats import MinimizationStats, phase
+from .writers import WRITERS
+
+ALGORITHMS = ('table', 'hopcroft', 'moore-numpy', 'moore-parallel', 'valmari')
+INPUT_EXTENSIONS = ('.jff', BINARY_EXTENSION)
+# Caché de cada proceso del pool, para no recorrer el directorio en cada fichero
+_caches = {}
+
+
+def expand_paths(paths: list) -> list:
+    """Expande directorios y patrones glob a una lista de ficheros sin repetir"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in sorted(names)
+                             if name.endswith(INPUT_EXTENSIONS))
+        elif glob.has_magic(path):
+            files.extend(sorted(glob.glob(path, recursive=True)))
+        else:
+            files.append(path)
+    return list(dict.fromkeys(files))
+
+
+def minimize_file(path: str, algorithm: str, output_format: str = None, output_dir: str = None,
+                  cache_dir: str = None, cache_bytes: int = DEFAULT_MAX_BYTES, with_stats: bool = False,
+                  nfa_method: str = None, compress_alphabet: bool = False, refine_workers: int = None,
+                  memory_limit: int = None, outputs: dict = None) -> tuple:
+    """Minimiza un fichero en un proceso del pool. Devuelve el número de
+    estados, el número de clases, el resultado en output_format si se pide y no
+    se escribe en output_dir, si el resultado ha salido de la caché y, con
+    with_stats, la línea de estadísticas. Si se da nfa_method, los ficheros
+    JFLAP se leen como autómatas no deterministas y se determinizan. Con
+    compress_alphabet los autómatas deterministas se compilan por clases de
+    símbolos. refine_workers es el número de procesos de moore-parallel. Con
+    memory_limit (en bytes) se minimiza con minimize_out_of_core() y se ignora
+    algorithm. outputs da la etiqueta de salida de cada estado por nombre."""
+    stats = MinimizationStats() if with_stats else None
+    if path.endswith(BINARY_EXTENSION):
+        with phase(stats, 'load'):
+            dfa = load_binary(path)
+        if outputs:
+            dfa.outputs = [outputs.get(name) for name in dfa.states]
+    elif nfa_method is not None:
+        with phase(stats, 'load'):
+            automaton = Afn(path)
+        with phase(stats, 'determinize'):
+            dfa = determinize(automaton, nfa_method, stats=stats)
+    else:
+        with phase(stats, 'load'):
+            automaton = Afd(path)
+        with phase(stats, 'complete'):
+            complete_automaton = CompleteAFD(automaton, outputs)
+        dfa = compile_automaton(complete_automaton, algorithm, compress_alphabet, stats)
+    cache = None
+    if cache_dir:
+        cache = _caches.get((cache_dir, cache_bytes))
+        if cache is None:
+            cache = _caches[(cache_dir, cache_bytes)] = PartitionCache(cache_dir, cache_bytes)
+    hits = cache.hits if cache is not None else 0
+    if memory_limit is not None:
+        result = minimize_out_of_core(dfa, memory_limit, stats=stats)
+    else:
+        result = minimize_compiled(dfa, algorithm, cache, stats, refine_workers)
+    hit = cache is not None and cache.hits > hits
+    text = None
+    if output_format is not None:
+        writer, extension = WRITERS[output_format]
+        if output_dir is not None:
+            name = os.path.splitext(os.path.basename(path))[0] + extension
+            with open(os.path.join(output_dir, name), 'w', encoding='utf-8') as out:
+                writer(result, out)
+        else:
+            out = io.StringIO()
+            writer(result, out)
+            text = out.getvalue()
+    return dfa.n_states(), result.n_classes, text, hit, stats.log_line() if stats is not None else None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m automatons',
+                                     description='Minimiza autómatas JFLAP por lotes.')
+    parser.add_argument('paths', nargs='+', help='ficheros, patrones glob o directorios')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(),
+                        help='número de procesos (por defecto, uno por CPU)')
+    parser.add_argument('-a', '--algorithm', choices=ALGORITHMS, default='hopcroft',
+                        help='algoritmo de minimización (por defecto, hopcroft)')
+    parser.add_argument('--refine-workers', type=int, metavar='N',
+                        help='procesos por minimización con -a moore-parallel (por defecto, '
+                             'las CPU entre los procesos de -j)')
+    parser.add_argument('--memory-limit', type=int, metavar='MiB',
+                        help='minimiza fuera de memoria, por trozos, sin pasar de MiB por '
+                             'minimización; sustituye a -a')
+    parser.add_argument('--labels', metavar='FICHERO',
+                        help='JSON con la etiqueta de salida (token) de cada estado, por nombre')
+    parser.add_argument('-f', '--format', choices=sorted(WRITERS),
+                        help='formato en el que escribir cada autómata mínimo')
+    parser.add_argument('-o', '--output-dir', metavar='DIR',
+                        help='directorio donde escribir los autómatas mínimos (con -f)')
+    parser.add_argument('--cache', metavar='DIR',
+                        help='directorio de la caché de resultados')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help='tamaño máximo de la caché en MiB (por defecto, %(default)s)')
+    parser.add_argument('--nfa', choices=METHODS, metavar='MÉTODO',
+                        help='lee autómatas no deterministas y los determiniza con el método '
+                             'indicado: %s' % ', '.join(METHODS))
+    parser.add_argument('--compress-alphabet', action='store_true',
+                        help='agrupa los símbolos que se comportan igual en todos los estados')
+    parser.add_argument('--stats', action='store_true',
+                        help='muestra los tiempos por fase y los contadores de cada fichero')
+    args = parser.parse_args(argv)
+
+    if args.output_dir is not None:
+        if args.format is None:
+            parser.error('-o/--output-dir necesita -f/--format')
+        os.makedirs(args.output_dir, exist_ok=True)
+    if args.cache is not None and args.algorithm == 'valmari':
+        parser.error('--cache no se puede usar con -a valmari')
+    if args.memory_limit is not None:
+        if args.cache is not None:
+            parser.error('--cache no se puede usar con --memory-limit')
+        # El algoritmo por trozos es el de Moore y trabaja sobre la tabla completa
+        args.algorithm = 'moore-numpy'
+    if args.nfa is not None and args.compress_alphabet:
+        parser.error('--compress-alphabet no se puede usar con --nfa')
+    outputs = None
+    if args.labels is not None:
+        if args.nfa is not None:
+            parser.error('--labels no se puede usar con --nfa')
+        with open(args.labels, encoding='utf-8') as f:
+            outputs = json.load(f)
+    if args.refine_workers is None:
+        args.refine_workers = max(1, (os.cpu_count() or 1) // args.workers)
+    files = expand_paths(args.paths)
+    if not files:
+        print('No se ha encontrado ningún autómata.', file=sys.stderr)
+        return 1
+    start = time.perf_counter()
+    total_states = 0
+    failures = 0
+    hits = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        jobs = {pool.submit(minimize_file, path, args.algorithm, args.format, args.output_dir,
+                            args.cache, args.cache_size * 1024 * 1024, args.stats, args.nfa,
+                            args.compress_alphabet, args.refine_workers,
+                            args.memory_limit * 1024 * 1024 if args.memory_limit is not None else None,
+                            outputs):
+                path for path in files}
+        # Mostramos cada resultado en cuanto termina; un fallo no detiene el lote
+        for job in as_completed(jobs):
+            path = jobs[job]
+            try:
+                n_states, n_classes, text, hit, log_line = job.result()
+            except Exception as error:
+                failures += 1
+                print('%s: ERROR %s' % (path, error), file=sys.stderr, flush=True)
+                continue
+            total_states += n_states
+            hits += hit
+            print('%s: %d estados -> %d' % (path, n_states, n_classes), flush=True)
+            if log_line is not None:
+                print('%s: %s' % (path, log_line), file=sys.stderr, flush=True)
+            if text is not None:
+                print(text, end='', flush=True)
+    elapsed = time.perf_counter() - start
+    print('%d ficheros (%d fallidos) en %.2f s: %.1f ficheros/s, %.0f estados/s' % (
+        len(files), failures, elapsed, len(files) / elapsed, total_states / elapsed), file=sys.stderr)
+    if args.cache:
+        print('caché: %d aciertos, %d fallos' % (hits, len(files) - failures - hits), file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,110 @@
+from array import array
+
+from .complete_afd import CompleteAFD as CompleteAFD, ERROR_STATE as ERROR_STATE
+
+NO_SINK = -1
+
+
+def initial_partition(dfa):
+    """Bloque inicial de cada estado de un CompiledDFA o SparseDFA, del que
+    parten todos los algoritmos. Sin etiquetas de salida es dfa.final (0 para
+    los no finales y 1 para los finales); con etiquetas, cada combinación
+    distinta de si es final y etiqueta es un bloque, y el 0 es siempre el de los
+    estados no finales sin etiqueta, como el de error."""
+    if dfa.outputs is None:
+        return dfa.final
+    blocks = {(0, None): 0}
+    labels = array('i', [0]) * len(dfa.final)
+    for q, output in enumerate(dfa.outputs):
+        labels[q] = blocks.setdefault((1 if dfa.final[q] else 0, output), len(blocks))
+    return labels
+
+
+class CompiledDFA:
+    """Representación compacta de un autómata completo.
+    Los estados se numeran de 0 a n-1 y los símbolos de 0 a k-1, y las transiciones
+    se guardan en una tabla plana de n·k enteros: el destino de q con el símbolo c
+    está en transitions[q * k + c]. Los nombres solo se usan al emitir resultados.
+    """
+
+    def __init__(self, states: list, alphabet: list, transitions, final: bytearray,
+                 initial: int, sink: int = NO_SINK, symbol_classes: list = None, outputs: list = None) -> None:
+        """Constructor a partir de las tablas ya numeradas
+        states: nombres de los estados, en el orden de sus índices
+        alphabet: símbolos, en el orden de sus índices
+        transitions: tabla plana de n·k enteros (array('i') o similar)
+        final: un byte por estado, distinto de 0 si el estado es final
+        initial: índice del estado inicial
+        sink: índice del estado de error, o NO_SINK si no hace falta
+        symbol_classes: si el alfabeto está comprimido (ver automatons.alphabet),
+            los símbolos originales de cada columna; si no, None
+        outputs: etiqueta de salida de cada estado (None si no tiene), o None si
+            el autómata no tiene etiquetas y solo se distingue si es final
+        """
+        self.states = states
+        self.alphabet = alphabet
+        self.transitions = transitions
+        self.final = final
+        self.initial = initial
+        self.sink = sink
+        self.symbol_classes = symbol_classes
+        self.outputs = outputs
+
+    @classmethod
+    def from_complete_afd(cls, complete_automaton: CompleteAFD) -> 'CompiledDFA':
+        """Numera los estados accesibles de un CompleteAFD y construye su tabla.
+        Los estados se ordenan por nombre, igual que en la tabla triangular.
+        """
+        states = sorted(complete_automaton.get_accessible_states_list())
+        alphabet = list(complete_automaton.get_alphabet())
+        state_index = {q: i for i, q in enumerate(states)}
+        k = len(alphabet)
+        transitions = array('i', bytes(4 * len(states) * k))
+        final = bytearray(len(states))
+        for i, q in enumerate(states):
+            final[i] = complete_automaton.is_final(q)
+            for c in range(k):
+                transitions[i * k + c] = state_index[complete_automaton.get_next_state(q, alphabet[c])]
+        initial = state_index[complete_automaton.automaton.getEstadoInicial()]
+        outputs = [complete_automaton.get_output(q) for q in states] if complete_automaton.outputs else None
+        return cls(states, alphabet, transitions, final, initial, state_index.get(ERROR_STATE, NO_SINK),
+                   outputs=outputs)
+
+    def n_states(self) -> int:
+        """Devuelve el número de estados"""
+        return len(self.states)
+
+    def n_symbols(self) -> int:
+        """Devuelve el número de símbolos del alfabeto"""
+        return len(self.alphabet)
+
+    def symbols_of(self, c: int) -> list:
+        """Devuelve los símbolos originales de la columna c"""
+        if self.symbol_classes is None:
+            return [self.alphabet[c]]
+        return self.symbol_classes[c]
+
+    def next_state(self, q: int, c: int) -> int:
+        """Devuelve el índice del estado al que se llega desde q con el símbolo c"""
+        return self.transitions[q * len(self.alphabet) + c]
+
+    def successors(self, q: int):
+        """Devuelve las parejas (símbolo, destino) de las transiciones de q"""
+        k = len(self.alphabet)
+        return enumerate(self.transitions[q * k:(q + 1) * k])
+
+    def is_final(self, q: int) -> bool:
+        """Devuelve si el estado q es final"""
+        return self.final[q] != 0
+
+    def output(self, q: int):
+        """Devuelve la etiqueta de salida del estado q, o None si no tiene"""
+        return self.outputs[q] if self.outputs is not None else None
+
+    def is_initial(self, q: int) -> bool:
+        """Devuelve si el estado q es el inicial"""
+        return q == self.initial
+
+    def state_name(self, q: int) -> str:
+        """Devuelve el nombre original del estado q"""
+        return self.states[q]
@@ -2,50 +2,86 @@ ERROR_STATE = 'q_error'
 
 
 class CompleteAFD:
-    """Clase wrapper para "completar" un autómata y eliminar estados inaccesibles.
+    """Clase wrapper para "completar" un autómata y eliminar estados inútiles.
     Exporta todas las funciones de un autómata, pero crea un nuevo estado 'q_error'
     en caso de que sea necesario, y extiende las funciones del autómata para que
-    tengan en cuenta este nuevo estado
+    tengan en cuenta este nuevo estado. El estado de error es virtual: no se guardan
+    transiciones hacia él, cualquier transición ausente lleva a él.
     """
 
-    def __init__(self, automaton):
+    def __init__(self, automaton, outputs: dict = None):
         """Constructor
-        Guardamos una lista con los estados accesibles, guardamos el autómata
-        original y añadimos el estado de error si es necesario
+        Guardamos una lista con los estados útiles (accesibles desde el inicial y desde
+        los que se llega a algún final), sus transiciones, el autómata original y
+        añadimos el estado de error si es necesario. Coste O(n + m), con m el número
+        de transiciones.
+        outputs: etiqueta de salida de cada estado (por nombre), por ejemplo el token
+            que reconoce. Si no se da, se usan las etiquetas <label> del fichero JFLAP,
+            si las hay. Los estados con etiqueta también cuentan como útiles.
         """
         self.automaton = automaton
-        self.accessible_states_list = [automaton.getEstadoInicial()]
-        complete = True
-        i = 0
+        if outputs is None:
+            outputs = getattr(automaton, 'etiquetas', None)
+        # Sin etiquetas, solo se distingue entre finales y no finales
+        self.outputs = outputs if outputs else None
+        initial = automaton.getEstadoInicial()
         # Recorremos el autómata como si fuese un grafo, en anchura. De esta forma
         # solo guardamos estados accesibles
-        while i < len(self.accessible_states_list):
-            q = self.accessible_states_list[i]
+        successors = {initial: automaton.transicionesDesde(initial)}
+        queue = [initial]
+        i = 0
+        while i < len(queue):
+            q = queue[i]
             i += 1
-            for c in automaton.getAlfabeto():
-                q_next = automaton.estadoSiguiente(q, c)
-                if q_next:
-                    if q_next not in self.accessible_states_list:
-                        self.accessible_states_list.append(q_next)
-                # Si para algún elemento del alfabeto no se llega a otro estado
-                # entonces el autómata no es completo
-                else:
-                    complete = False
+            for q_next in successors[q].values():
+                if q_next not in successors:
+                    successors[q_next] = automaton.transicionesDesde(q_next)
+                    queue.append(q_next)
+        self.n_reachable = len(queue)
+        # Recorremos las transiciones al revés desde los estados finales para
+        # quedarnos con los estados desde los que se llega a alguno
+        predecessors = {q: [] for q in queue}
+        for q in queue:
+            for q_next in successors[q].values():
+                predecessors[q_next].append(q)
+        useful = {q for q in queue if automaton.esFinal(q) or self.get_output(q) is not None}
+        stack = list(useful)
+        while stack:
+            q = stack.pop()
+            for p in predecessors[q]:
+                if p not in useful:
+                    useful.add(p)
+                    stack.append(p)
+        # El estado inicial se conserva siempre, aunque el lenguaje sea vacío
+        useful.add(initial)
+        self.accessible_states_list = [q for q in queue if q in useful]
+        self.n_useful = len(self.accessible_states_list)
+        # Guardamos solo las transiciones entre estados útiles; las que van a
+        # estados eliminados pasan a ir, implícitamente, al estado de error
+        alphabet_size = len(automaton.getAlfabeto())
+        complete = True
+        self.transitions = {}
+        for q in self.accessible_states_list:
+            self.transitions[q] = {c: q_next for c, q_next in successors[q].items() if q_next in useful}
+            # Si para algún elemento del alfabeto no se llega a otro estado
+            # entonces el autómata no es completo
+            if len(self.transitions[q]) < alphabet_size:
+                complete = False
         # Si el autómata no es completo añadimos el estado de error
         if not complete:
             self.accessible_states_list.append(ERROR_STATE)
 
     def get_accessible_states_list(self) -> list:
-        """Método que devuelve una lista de los estados accesibles"""
+        """Método que devuelve una lista de los estados útiles, incluido el de error"""
         return self.accessible_states_list
 
     def get_next_state(self, q: str, c: str) -> str:
         """Devuelve el siguiente estado desde q con el elemento del alfabeto c"""
         # Si q es el estado de error, o el siguiente estado no existe, devolvemos
         # el estado de error.
-        if q == ERROR_STATE or not self.automaton.estadoSiguiente(q, c):
+        if q == ERROR_STATE:
             return ERROR_STATE
-        return self.automaton.estadoSiguiente(q, c)
+        return self.transitions[q].get(c, ERROR_STATE)
 
     def is_final(self, q: str) -> bool:
         """Devuelve si un estado q es final"""
@@ -54,6 +90,12 @@ class CompleteAFD:
             return False
         return self.automaton.esFinal(q)
 
+    def get_output(self, q: str):
+        """Devuelve la etiqueta de salida de un estado q, o None si no tiene"""
+        if self.outputs is None or q == ERROR_STATE:
+            return None
+        return self.outputs.get(q)
+
     def is_initial(self, q: str) -> bool:
         """Devuelve si un estado q es inicial"""
         # El estado de error no es inicial
@@ -0,0 +1,91 @@
+from array import array
+
+from .compiled_dfa import CompiledDFA as CompiledDFA, NO_SINK as NO_SINK
+
+
+class MinimizedDFA:
+    """Resultado de minimizar un autómata.
+    Guarda la clase de equivalencia de cada estado del autómata original y la
+    tabla de transiciones entre clases, con el mismo formato plano que CompiledDFA:
+    el destino de la clase c con el símbolo s está en transitions[c * k + s].
+    """
+
+    def __init__(self, dfa: CompiledDFA, class_of: array, n_classes: int) -> None:
+        """Constructor
+        dfa: autómata compilado (CompiledDFA o SparseDFA) que se ha minimizado
+        class_of: clase de cada estado de dfa, numeradas de 0 a n_classes-1
+        """
+        self.dfa = dfa
+        self.alphabet = dfa.alphabet
+        self.class_of = class_of
+        self.n_classes = n_classes
+        k = dfa.n_symbols()
+        # Tomamos un estado de cada clase para calcular sus transiciones
+        representative = array('i', [-1]) * n_classes
+        for q in range(dfa.n_states()):
+            if representative[class_of[q]] < 0:
+                representative[class_of[q]] = q
+        self.initial = class_of[dfa.initial]
+        self.sink = class_of[dfa.sink] if dfa.sink != NO_SINK else NO_SINK
+        # Las transiciones que no da el autómata (si es un SparseDFA) van a la
+        # clase del estado de error
+        self.transitions = array('i', [max(self.sink, 0)]) * (n_classes * k)
+        self.final = bytearray(n_classes)
+        for c in range(n_classes):
+            q = representative[c]
+            self.final[c] = dfa.is_final(q)
+            for s, q_next in dfa.successors(q):
+                self.transitions[c * k + s] = class_of[q_next]
+        # Todos los estados de una clase tienen la misma etiqueta de salida
+        self.outputs = None
+        if dfa.outputs is not None:
+            self.outputs = [dfa.outputs[q] for q in representative]
+        self._members = None
+
+    def n_states(self) -> int:
+        """Devuelve el número de estados del autómata mínimo"""
+        return self.n_classes
+
+    def n_symbols(self) -> int:
+        """Devuelve el número de símbolos del alfabeto"""
+        return len(self.alphabet)
+
+    def next_state(self, c: int, s: int) -> int:
+        """Devuelve la clase a la que se llega desde la clase c con el símbolo s"""
+        return self.transitions[c * len(self.alphabet) + s]
+
+    def is_final(self, c: int) -> bool:
+        """Devuelve si la clase c es final"""
+        return self.final[c] != 0
+
+    def output(self, c: int):
+        """Devuelve la etiqueta de salida de la clase c, o None si no tiene"""
+        return self.outputs[c] if self.outputs is not None else None
+
+    def is_initial(self, c: int) -> bool:
+        """Devuelve si la clase c es la inicial"""
+        return c == self.initial
+
+    def members(self, c: int) -> list:
+        """Devuelve los índices de los estados originales de la clase c, en orden"""
+        if self._members is None:
+            # Se calculan todas las clases de una vez, en una sola pasada
+            self._members = [[] for _ in range(self.n_classes)]
+            for q in range(self.dfa.n_states()):
+                self._members[self.class_of[q]].append(q)
+        return self._members[c]
+
+    def class_name(self, c: int) -> str:
+        """Nombre corto de la clase c: el nombre de su primer estado"""
+        return self.dfa.state_name(self.members(c)[0])
+
+    def class_label(self, c: int) -> str:
+        """Etiqueta larga de la clase c: los nombres de todos sus estados entre llaves"""
+        return '{' + str([self.dfa.state_name(q) for q in self.members(c)]).strip('[]') + '}'
+
+    def to_compiled(self) -> CompiledDFA:
+        """Devuelve el autómata mínimo como CompiledDFA, con cada clase llamada
+        como class_name(), para volver a operar con él"""
+        states = [self.class_name(c) for c in range(self.n_classes)]
+        return CompiledDFA(states, list(self.alphabet), array('i', self.transitions), bytearray(self.final),
+                           self.initial, self.sink, self.dfa.symbol_classes, self.outputs)
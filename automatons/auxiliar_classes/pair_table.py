@@ -0,0 +1,62 @@
+from array import array
+
+# Número de bits a 1 de cada byte
+POPCOUNT = bytes(bin(b).count('1') for b in range(256))
+
+
+def pair_index(q_a: int, q_b: int) -> int:
+    """Devuelve el número de la pareja {q_a, q_b}, con q_a > q_b"""
+    return q_a * (q_a - 1) // 2 + q_b
+
+
+class PairTable:
+    """Tabla triangular compacta: un bit por cada pareja de estados {q_a, q_b}
+    con q_a > q_b, indexada por su número de pareja. Las dependencias entre
+    parejas se guardan aparte en formato CSR: los dependientes de la pareja p son
+    edges[offsets[p]:offsets[p + 1]].
+    """
+
+    def __init__(self, n_states: int) -> None:
+        """Construye la tabla con todas las parejas sin marcar"""
+        self.n_states = n_states
+        self.n_pairs = n_states * (n_states - 1) // 2
+        self.bits = bytearray((self.n_pairs + 7) // 8)
+        self.offsets = None
+        self.edges = None
+
+    def set_dependencies(self, offsets: array, edges: array) -> None:
+        """Guarda la lista de dependientes de cada pareja en formato CSR"""
+        self.offsets = offsets
+        self.edges = edges
+
+    def is_marked(self, q_a: int, q_b: int) -> bool:
+        """Devuelve si la pareja {q_a, q_b}, con q_a > q_b, está marcada"""
+        return self.is_marked_index(pair_index(q_a, q_b))
+
+    def is_marked_index(self, p: int) -> bool:
+        """Devuelve si la pareja número p está marcada"""
+        return self.bits[p >> 3] & (1 << (p & 7)) != 0
+
+    def n_marked(self) -> int:
+        """Devuelve cuántas parejas están marcadas, contando los bits byte a byte"""
+        return sum(POPCOUNT[b] for b in self.bits)
+
+    def mark_index(self, p: int) -> None:
+        """Marca la pareja número p, sin propagar"""
+        self.bits[p >> 3] |= 1 << (p & 7)
+
+    def mark(self, p: int) -> None:
+        """Marca la pareja número p y, con una pila en lugar de recursión, todas
+        las que dependen de ella y no estén marcadas."""
+        bits = self.bits
+        offsets = self.offsets
+        edges = self.edges
+        self.mark_index(p)
+        stack = [p]
+        while stack:
+            p = stack.pop()
+            for e in range(offsets[p], offsets[p + 1]):
+                d = edges[e]
+                if not bits[d >> 3] & (1 << (d & 7)):
+                    bits[d >> 3] |= 1 << (d & 7)
+                    stack.append(d)
@@ -0,0 +1,172 @@
+from array import array
+from bisect import bisect_left
+
+from .compiled_dfa import CompiledDFA as CompiledDFA, NO_SINK as NO_SINK, initial_partition as initial_partition
+from .complete_afd import CompleteAFD as CompleteAFD, ERROR_STATE as ERROR_STATE
+
+
+def _live_states(dfa: CompiledDFA) -> bytearray:
+    """Marca los estados desde los que se llega a un estado final o con
+    etiqueta, recorriendo hacia atrás las transiciones (en formato CSR)"""
+    n = dfa.n_states()
+    transitions = dfa.transitions
+    incoming_offsets = array('i', [0]) * (n + 1)
+    for q_next in transitions:
+        incoming_offsets[q_next + 1] += 1
+    for q in range(n):
+        incoming_offsets[q + 1] += incoming_offsets[q]
+    position = incoming_offsets[:-1]
+    sources = array('i', [0]) * len(transitions)
+    k = dfa.n_symbols()
+    for t, q_next in enumerate(transitions):
+        sources[position[q_next]] = t // k
+        position[q_next] += 1
+    labels = initial_partition(dfa)
+    live = bytearray(n)
+    stack = [q for q in range(n) if labels[q]]
+    for q in stack:
+        live[q] = 1
+    while stack:
+        q = stack.pop()
+        for p in sources[incoming_offsets[q]:incoming_offsets[q + 1]]:
+            if not live[p]:
+                live[p] = 1
+                stack.append(p)
+    return live
+
+
+class SparseDFA:
+    """Representación compacta de un autómata parcial.
+    Los estados y símbolos se numeran igual que en CompiledDFA, pero solo se
+    guardan las transiciones que existen, en formato CSR: las de q ocupan las
+    posiciones offsets[q]..offsets[q+1]-1 de symbols y targets, ordenadas por
+    símbolo. Cualquier transición ausente lleva al estado de error, que no tiene
+    transiciones guardadas. Ocupa O(n + m) en lugar de O(n·k).
+    """
+
+    def __init__(self, states: list, alphabet: list, offsets: array, symbols: array, targets: array,
+                 final: bytearray, initial: int, sink: int = NO_SINK, symbol_classes: list = None,
+                 outputs: list = None) -> None:
+        """Constructor a partir de las tablas ya numeradas
+        states: nombres de los estados, en el orden de sus índices
+        alphabet: símbolos, en el orden de sus índices
+        offsets: n+1 enteros, inicio de las transiciones de cada estado
+        symbols, targets: símbolo y destino de cada transición
+        final: un byte por estado, distinto de 0 si el estado es final
+        initial: índice del estado inicial
+        sink: índice del estado de error, o NO_SINK si el autómata es completo
+        symbol_classes: los símbolos originales de cada columna, como en CompiledDFA
+        outputs: etiqueta de salida de cada estado, como en CompiledDFA
+        """
+        self.states = states
+        self.alphabet = alphabet
+        self.offsets = offsets
+        self.symbols = symbols
+        self.targets = targets
+        self.final = final
+        self.initial = initial
+        self.sink = sink
+        self.symbol_classes = symbol_classes
+        self.outputs = outputs
+
+    @classmethod
+    def from_complete_afd(cls, complete_automaton: CompleteAFD) -> 'SparseDFA':
+        """Numera los estados útiles de un CompleteAFD como from_complete_afd() de
+        CompiledDFA, pero sin completar las transiciones. Coste O(n + m·log k)."""
+        states = sorted(complete_automaton.get_accessible_states_list())
+        alphabet = list(complete_automaton.get_alphabet())
+        state_index = {q: i for i, q in enumerate(states)}
+        symbol_index = {c: i for i, c in enumerate(alphabet)}
+        offsets = array('i', [0]) * (len(states) + 1)
+        symbols = array('i')
+        targets = array('i')
+        final = bytearray(len(states))
+        for i, q in enumerate(states):
+            if q != ERROR_STATE:
+                final[i] = complete_automaton.is_final(q)
+                row = sorted((symbol_index[c], state_index[q_next])
+                             for c, q_next in complete_automaton.transitions[q].items())
+                for c, q_next in row:
+                    symbols.append(c)
+                    targets.append(q_next)
+            offsets[i + 1] = len(symbols)
+        initial = state_index[complete_automaton.automaton.getEstadoInicial()]
+        outputs = [complete_automaton.get_output(q) for q in states] if complete_automaton.outputs else None
+        return cls(states, alphabet, offsets, symbols, targets, final, initial,
+                   state_index.get(ERROR_STATE, NO_SINK), outputs=outputs)
+
+    @classmethod
+    def from_compiled(cls, dfa: CompiledDFA) -> 'SparseDFA':
+        """Quita de un CompiledDFA las transiciones a los estados muertos: el de
+        error y cualquier otro desde el que no se llega a un estado final (o con
+        etiqueta), que pasan a comportarse como el de error. Si el autómata no
+        tiene estado de error, hace de él el primer estado muerto. Coste O(n·k)."""
+        n = dfa.n_states()
+        k = dfa.n_symbols()
+        transitions = dfa.transitions
+        live = _live_states(dfa)
+        sink = dfa.sink
+        if sink == NO_SINK and not all(live):
+            sink = live.index(0)
+        offsets = array('i', [0]) * (n + 1)
+        symbols = array('i')
+        targets = array('i')
+        for q in range(n):
+            if live[q]:
+                for c in range(k):
+                    q_next = transitions[q * k + c]
+                    if live[q_next]:
+                        symbols.append(c)
+                        targets.append(q_next)
+            offsets[q + 1] = len(symbols)
+        return cls(dfa.states, dfa.alphabet, offsets, symbols, targets, dfa.final, dfa.initial, sink,
+                   dfa.symbol_classes, dfa.outputs)
+
+    def n_states(self) -> int:
+        """Devuelve el número de estados"""
+        return len(self.states)
+
+    def n_symbols(self) -> int:
+        """Devuelve el número de símbolos del alfabeto"""
+        return len(self.alphabet)
+
+    def n_transitions(self) -> int:
+        """Devuelve el número de transiciones guardadas"""
+        return len(self.targets)
+
+    def symbols_of(self, c: int) -> list:
+        """Devuelve los símbolos originales de la columna c"""
+        if self.symbol_classes is None:
+            return [self.alphabet[c]]
+        return self.symbol_classes[c]
+
+    def next_state(self, q: int, c: int) -> int:
+        """Devuelve el índice del estado al que se llega desde q con el símbolo c"""
+        start = self.offsets[q]
+        end = self.offsets[q + 1]
+        i = bisect_left(self.symbols, c, start, end)
+        if i < end and self.symbols[i] == c:
+            return self.targets[i]
+        return self.sink
+
+    def successors(self, q: int):
+        """Devuelve las parejas (símbolo, destino) de las transiciones guardadas de q"""
+        start = self.offsets[q]
+        end = self.offsets[q + 1]
+        return zip(self.symbols[start:end], self.targets[start:end])
+
+    def is_final(self, q: int) -> bool:
+        """Devuelve si el estado q es final"""
+        return self.final[q] != 0
+
+    def output(self, q: int):
+        """Devuelve la etiqueta de salida del estado q, o None si no tiene"""
+        return self.outputs[q] if self.outputs is not None else None
+
+    def is_initial(self, q: int) -> bool:
+        """Devuelve si el estado q es el inicial"""
+        return q == self.initial
+
+    def state_name(self, q: int) -> str:
+        """Devuelve el nombre original del estado q"""
+        return self.states[q]
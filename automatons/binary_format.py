@@ -0,0 +1,136 @@
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+from .auxiliar_classes.compiled_dfa import CompiledDFA as CompiledDFA
+
+# Extensión de los ficheros binarios
+BINARY_EXTENSION = '.afdb'
+MAGIC = b'AFDB'
+FORMAT_VERSION = 2
+# Cabecera: firma, versión, n, k, inicial, sumidero, bytes de los nombres de
+# estados, bytes de los nombres de símbolos y, desde la versión 2, bytes de los
+# metadatos
+HEADER_V1 = struct.Struct('<4sIIIiiQQ')
+HEADER = struct.Struct('<4sIIIiiQQQ')
+# Para cada byte del mapa de bits de finales, los 8 bytes (0 ó 1) que representa
+_BITMAP_BYTES = [bytes((b >> i) & 1 for i in range(8)) for b in range(256)]
+
+
+class NameTable:
+    """Secuencia de nombres guardada en el fichero: una tabla de desplazamientos
+    y un bloque de texto UTF-8. Los nombres se decodifican solo al pedirlos."""
+
+    def __init__(self, offsets, blob) -> None:
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode('utf-8')
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def _padding(size: int) -> int:
+    """Bytes de relleno para alinear a 8 una sección de tamaño size"""
+    return -size % 8
+
+
+def _encode_names(names) -> tuple:
+    """Devuelve la tabla de desplazamientos y el bloque de texto de una lista de nombres"""
+    encoded = [name.encode('utf-8') for name in names]
+    offsets = array('q', [0]) * (len(encoded) + 1)
+    for i, name in enumerate(encoded):
+        offsets[i + 1] = offsets[i] + len(name)
+    return offsets, b''.join(encoded)
+
+
+def save_binary(dfa: CompiledDFA, path: str) -> None:
+    """Guarda un autómata compilado en formato binario. El fichero contiene, por
+    orden: cabecera, nombres de estados, nombres de símbolos, mapa de bits de
+    estados finales, la matriz n×k de transiciones en int32 little-endian y, si
+    el autómata tiene etiquetas de salida o el alfabeto comprimido, un JSON con
+    "outputs" y "symbol_classes". Cada sección está alineada a 8 bytes."""
+    n = dfa.n_states()
+    k = dfa.n_symbols()
+    state_offsets, state_blob = _encode_names(dfa.states)
+    symbol_offsets, symbol_blob = _encode_names(dfa.alphabet)
+    bitmap = bytearray((n + 7) // 8)
+    for q in range(n):
+        if dfa.final[q]:
+            bitmap[q >> 3] |= 1 << (q & 7)
+    transitions = array('i', dfa.transitions)
+    metadata = {}
+    if dfa.outputs is not None:
+        metadata['outputs'] = list(dfa.outputs)
+    if dfa.symbol_classes is not None:
+        metadata['symbol_classes'] = dfa.symbol_classes
+    metadata = json.dumps(metadata, ensure_ascii=False).encode('utf-8') if metadata else b''
+    if sys.byteorder != 'little':
+        state_offsets.byteswap()
+        symbol_offsets.byteswap()
+        transitions.byteswap()
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, n, k, dfa.initial, dfa.sink,
+                            len(state_blob), len(symbol_blob), len(metadata)))
+        for section in (state_offsets.tobytes(), state_blob, symbol_offsets.tobytes(),
+                        symbol_blob, bytes(bitmap), transitions.tobytes()):
+            f.write(section)
+            f.write(bytes(_padding(len(section))))
+        f.write(metadata)
+
+
+def load_binary(path: str) -> CompiledDFA:
+    """Carga un autómata guardado con save_binary(). El fichero se proyecta en
+    memoria con mmap y la tabla de transiciones es una vista sobre él, sin copia.
+    También lee los ficheros de la versión 1, que no tienen metadatos."""
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(data)
+    magic, version = struct.unpack_from('<4sI', view)
+    if magic != MAGIC:
+        raise ValueError('El fichero no es un autómata binario: ' + path)
+    if version == 1:
+        _, _, n, k, initial, sink, state_bytes, symbol_bytes = HEADER_V1.unpack_from(view)
+        metadata_bytes = 0
+        position = HEADER_V1.size
+    elif version == FORMAT_VERSION:
+        _, _, n, k, initial, sink, state_bytes, symbol_bytes, metadata_bytes = HEADER.unpack_from(view)
+        position = HEADER.size
+    else:
+        raise ValueError('Versión de formato binario no soportada: %d' % version)
+
+    def section(size: int) -> memoryview:
+        nonlocal position
+        start = position
+        position += size + _padding(size)
+        return view[start:start + size]
+
+    state_offsets = section(8 * (n + 1))
+    state_blob = section(state_bytes)
+    symbol_offsets = section(8 * (k + 1))
+    symbol_blob = section(symbol_bytes)
+    bitmap = section((n + 7) // 8)
+    transitions = section(4 * n * k)
+    metadata = json.loads(bytes(section(metadata_bytes)).decode('utf-8')) if metadata_bytes else {}
+    if sys.byteorder == 'little':
+        state_offsets = state_offsets.cast('q')
+        symbol_offsets = symbol_offsets.cast('q')
+        transitions = transitions.cast('i')
+    else:
+        # En máquinas big-endian no podemos usar la vista directamente
+        state_offsets, symbol_offsets, transitions = (
+            array('q', bytes(state_offsets)), array('q', bytes(symbol_offsets)), array('i', bytes(transitions)))
+        for a in (state_offsets, symbol_offsets, transitions):
+            a.byteswap()
+    final = bytearray(b''.join(_BITMAP_BYTES[b] for b in bitmap)[:n])
+    alphabet = list(NameTable(symbol_offsets, symbol_blob))
+    return CompiledDFA(NameTable(state_offsets, state_blob), alphabet, transitions, final, initial, sink,
+                       metadata.get('symbol_classes'), metadata.get('outputs'))
@@ -0,0 +1,172 @@
+import hashlib
+import os
+import struct
+import sys
+from array import array
+
+from .auxiliar_classes.compiled_dfa import CompiledDFA as CompiledDFA
+
+# Extensión de las entradas de la caché
+ENTRY_EXTENSION = '.part'
+# Tamaño máximo por defecto de la caché: 256 MiB
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def canonical_form(dfa: CompiledDFA) -> tuple:
+    """Calcula un hash del autómata que no depende de los nombres ni del orden de
+    los estados. Los estados se renumeran en anchura desde el inicial recorriendo
+    los símbolos ordenados. Devuelve el hash y, para cada estado, su índice canónico.
+    """
+    n = dfa.n_states()
+    k = dfa.n_symbols()
+    transitions = dfa.transitions
+    symbols = sorted(range(k), key=lambda c: dfa.alphabet[c])
+    index = [-1] * n
+    index[dfa.initial] = 0
+    order = [dfa.initial]
+    for q in order:
+        for c in symbols:
+            q_next = transitions[q * k + c]
+            if index[q_next] < 0:
+                index[q_next] = len(order)
+                order.append(q_next)
+    # Los estados inaccesibles, si los hubiera, van al final en su orden original
+    for q in range(n):
+        if index[q] < 0:
+            index[q] = len(order)
+            order.append(q)
+    table = array('i', [0]) * (n * k)
+    for i, q in enumerate(order):
+        for j, c in enumerate(symbols):
+            table[i * k + j] = index[transitions[q * k + c]]
+    if sys.byteorder != 'little':
+        table.byteswap()
+    digest = hashlib.sha256()
+    digest.update(struct.pack('<II', n, k))
+    for c in symbols:
+        name = dfa.alphabet[c].encode('utf-8')
+        digest.update(struct.pack('<I', len(name)))
+        digest.update(name)
+    digest.update(bytes(1 if dfa.final[q] else 0 for q in order))
+    digest.update(table.tobytes())
+    if dfa.outputs is not None:
+        # Las etiquetas de salida cambian la partición, así que forman parte del hash
+        for q in order:
+            label = dfa.outputs[q]
+            if label is None:
+                digest.update(b'\x00')
+            else:
+                label = str(label).encode('utf-8')
+                digest.update(b'\x01' + struct.pack('<I', len(label)))
+                digest.update(label)
+    return digest.hexdigest(), index
+
+
+def canonical_partition(class_of, index) -> array:
+    """Pasa la clase de cada estado a numeración canónica: la partición se indexa
+    por el índice canónico de cada estado y las clases se numeran por orden de
+    aparición, así que no depende de los nombres ni del orden de los estados"""
+    n = len(class_of)
+    partition = array('i', [0]) * n
+    class_ids = {}
+    for q in sorted(range(0, n), key=lambda q: index[q]):
+        partition[index[q]] = class_ids.setdefault(class_of[q], len(class_ids))
+    return partition
+
+
+class PartitionCache:
+    """Caché en disco de particiones en clases de equivalencia, indexada por el
+    hash canónico del autómata. Cada entrada guarda la clase de cada estado en
+    numeración canónica. Cuando el tamaño total supera max_bytes se borran las
+    entradas usadas hace más tiempo. El tamaño total se mide al crear la caché y
+    después se lleva la cuenta de lo que se escribe, así que el directorio solo
+    se recorre cuando la cuenta pasa de max_bytes; lo que escriban otros
+    procesos en el mismo directorio se ve en ese recorrido.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """Crea el directorio de la caché si no existe"""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self.total_bytes = sum(size for _, size, _ in self._entries())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ENTRY_EXTENSION)
+
+    def load(self, key: str, n: int = None):
+        """Devuelve la partición canónica guardada para key, o None si no está.
+        Si se da n, las entradas que no tienen n estados (por ejemplo, truncadas)
+        cuentan como fallos."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        if len(data) % 4 != 0 or (n is not None and len(data) != 4 * n):
+            self.misses += 1
+            return None
+        # Actualizamos la fecha de uso para la política LRU
+        os.utime(path)
+        self.hits += 1
+        partition = array('i')
+        partition.frombytes(data)
+        if sys.byteorder != 'little':
+            partition.byteswap()
+        return partition
+
+    def store(self, key: str, partition: array) -> None:
+        """Guarda la partición canónica de key y aplica el límite de tamaño"""
+        data = array('i', partition)
+        if sys.byteorder != 'little':
+            data.byteswap()
+        path = self._path(key)
+        # Si la entrada ya existe, su tamaño deja de contar al reemplazarla
+        try:
+            self.total_bytes -= os.stat(path).st_size
+        except FileNotFoundError:
+            pass
+        # Escribimos en un temporal y lo renombramos para que otros procesos
+        # nunca lean una entrada a medias
+        temp = '%s.%d.tmp' % (path, os.getpid())
+        with open(temp, 'wb') as f:
+            f.write(data.tobytes())
+        os.replace(temp, path)
+        self.total_bytes += len(data) * data.itemsize
+        if self.total_bytes > self.max_bytes:
+            self._evict()
+
+    def _entries(self) -> list:
+        """Devuelve la fecha de uso, el tamaño y la ruta de cada entrada"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(ENTRY_EXTENSION):
+                try:
+                    info = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((info.st_mtime, info.st_size, entry.path))
+        return entries
+
+    def _evict(self) -> None:
+        """Borra las entradas menos usadas hasta quedar por debajo de max_bytes"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self.total_bytes = total
+
+    def stats(self) -> dict:
+        """Devuelve los contadores de aciertos y fallos"""
+        return {'hits': self.hits, 'misses': self.misses}
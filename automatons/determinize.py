@@ -0,0 +1,173 @@
+"""Determinización de autómatas no deterministas (jflap.Afn).
+
+Los conjuntos de estados se representan como enteros usados como conjuntos de
+bits: el estado i del autómata no determinista es el bit i. Así la unión es un
+OR y cada conjunto se puede usar directamente como clave de un diccionario.
+"""
+from array import array
+
+from .auxiliar_classes.compiled_dfa import CompiledDFA as CompiledDFA, NO_SINK as NO_SINK
+from .auxiliar_classes.complete_afd import ERROR_STATE as ERROR_STATE
+from .stats import MinimizationStats as MinimizationStats
+
+METHODS = ('subset', 'brzozowski')
+
+
+def _bits(subset: int):
+    """Recorre los índices de los bits activos de subset, de menor a mayor"""
+    while subset:
+        low = subset & -subset
+        yield low.bit_length() - 1
+        subset ^= low
+
+
+class _Nfa:
+    """Autómata no determinista sin transiciones lambda, numerado.
+    successors[c][q] es el conjunto (entero) de estados a los que se llega desde
+    q con el símbolo c, e initial y final son también conjuntos de estados.
+    """
+
+    def __init__(self, states: list, alphabet: list, successors: list, initial: int, final: int) -> None:
+        self.states = states
+        self.alphabet = alphabet
+        self.successors = successors
+        self.initial = initial
+        self.final = final
+
+    @classmethod
+    def from_afn(cls, automaton) -> '_Nfa':
+        """Numera los estados de un Afn y elimina las transiciones lambda: cada
+        transición lleva a la clausura lambda de su destino, y el conjunto inicial
+        es la clausura del estado inicial. Cada clausura se calcula una sola vez."""
+        states = sorted(automaton.getEstados())
+        alphabet = sorted(automaton.getAlfabeto())
+        state_index = {q: i for i, q in enumerate(states)}
+        symbol_index = {c: i for i, c in enumerate(alphabet)}
+        n = len(states)
+        lambdas = [0] * n
+        direct = [[0] * n for _ in alphabet]
+        for i, q in enumerate(states):
+            for c, targets in automaton.sucesoresDesde(q).items():
+                subset = 0
+                for target in targets:
+                    subset |= 1 << state_index[target]
+                if c is None:
+                    lambdas[i] = subset
+                else:
+                    direct[symbol_index[c]][i] = subset
+        # Clausura lambda de cada estado, en profundidad y con memoria
+        closures = [None] * n
+
+        def closure(q: int) -> int:
+            if closures[q] is None:
+                result = 1 << q
+                stack = [q]
+                while stack:
+                    for p in _bits(lambdas[stack.pop()] & ~result):
+                        result |= 1 << p
+                        if closures[p] is not None:
+                            result |= closures[p]
+                        else:
+                            stack.append(p)
+                closures[q] = result
+            return closures[q]
+
+        def closure_of(subset: int) -> int:
+            result = 0
+            for q in _bits(subset):
+                result |= closure(q)
+            return result
+
+        successors = [[closure_of(subset) for subset in row] for row in direct]
+        final = 0
+        for i, q in enumerate(states):
+            if automaton.esFinal(q):
+                final |= 1 << i
+        initial = closure(state_index[automaton.getEstadoInicial()])
+        return cls(states, alphabet, successors, initial, final)
+
+    def reverse(self) -> '_Nfa':
+        """Autómata que acepta las palabras del lenguaje al revés"""
+        n = len(self.states)
+        successors = []
+        for row in self.successors:
+            reversed_row = [0] * n
+            for q in range(n):
+                for p in _bits(row[q]):
+                    reversed_row[p] |= 1 << q
+            successors.append(reversed_row)
+        return _Nfa(self.states, self.alphabet, successors, self.final, self.initial)
+
+
+def _subset_construction(nfa: _Nfa, max_states: int = None) -> tuple:
+    """Construcción de subconjuntos explorando solo los conjuntos accesibles
+    desde el inicial. Devuelve los conjuntos en orden de descubrimiento, la tabla
+    plana de transiciones, los estados finales y el índice del conjunto vacío
+    (NO_SINK si no aparece)."""
+    k = len(nfa.alphabet)
+    successors = nfa.successors
+    index = {nfa.initial: 0}
+    subsets = [nfa.initial]
+    transitions = array('i')
+    final = bytearray()
+    for subset in subsets:
+        members = list(_bits(subset))
+        final.append(1 if subset & nfa.final else 0)
+        for c in range(k):
+            row = successors[c]
+            target = 0
+            for q in members:
+                target |= row[q]
+            i = index.get(target)
+            if i is None:
+                i = len(subsets)
+                if max_states is not None and i >= max_states:
+                    raise ValueError('La determinización supera los %d estados' % max_states)
+                index[target] = i
+                subsets.append(target)
+            transitions.append(i)
+    return subsets, transitions, final, index.get(0, NO_SINK)
+
+
+def _as_nfa(dfa: tuple, alphabet: list) -> _Nfa:
+    """Ve el resultado de _subset_construction() como un _Nfa con un único
+    sucesor por símbolo, para poder invertirlo"""
+    subsets, transitions, final, _ = dfa
+    n = len(subsets)
+    k = len(alphabet)
+    successors = [[1 << transitions[q * k + c] for q in range(n)] for c in range(k)]
+    final_set = 0
+    for q in range(n):
+        if final[q]:
+            final_set |= 1 << q
+    return _Nfa(['q%d' % q for q in range(n)], alphabet, successors, 1, final_set)
+
+
+def determinize(automaton, method: str = 'subset', max_states: int = None,
+                stats: MinimizationStats = None) -> CompiledDFA:
+    """Convierte un Afn (con o sin transiciones lambda) en un CompiledDFA que se
+    puede pasar a minimize_compiled().
+
+    Con method='subset' se usa la construcción de subconjuntos y cada estado se
+    llama como el conjunto de estados que representa. Con method='brzozowski' se
+    invierte y determiniza dos veces, lo que da directamente el autómata mínimo y
+    puede ser más rápido cuando la construcción de subconjuntos explota; los
+    estados se llaman q0, q1, ... Si el resultado supera max_states estados se
+    lanza ValueError. El conjunto vacío hace de estado de error.
+    """
+    nfa = _Nfa.from_afn(automaton)
+    if method == 'subset':
+        subsets, transitions, final, sink = _subset_construction(nfa, max_states)
+        states = ['{' + ','.join(nfa.states[q] for q in _bits(subset)) + '}' for subset in subsets]
+    elif method == 'brzozowski':
+        first = _subset_construction(nfa.reverse(), max_states)
+        subsets, transitions, final, sink = _subset_construction(_as_nfa(first, nfa.alphabet).reverse(), max_states)
+        states = ['q%d' % q for q in range(len(subsets))]
+    else:
+        raise ValueError('Método de determinización desconocido: ' + method)
+    if sink != NO_SINK:
+        states[sink] = ERROR_STATE
+    if stats is not None:
+        stats.count('nfa_states', len(nfa.states))
+        stats.count('subsets', len(subsets))
+    return CompiledDFA(states, list(nfa.alphabet), transitions, final, 0, sink)
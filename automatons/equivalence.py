@@ -0,0 +1,99 @@
+from .auxiliar_classes.complete_afd import CompleteAFD as CompleteAFD
+from .auxiliar_classes.compiled_dfa import CompiledDFA as CompiledDFA
+from .auxiliar_classes.disjoint_set_union import StateDisjointSetUnion as StateDisjointSetUnion
+
+
+def _compile(automaton) -> CompiledDFA:
+    """Compila un Afd; los autómatas ya compilados se usan tal cual"""
+    if isinstance(automaton, CompiledDFA):
+        return automaton
+    return CompiledDFA.from_complete_afd(CompleteAFD(automaton))
+
+
+def _columns(dfa: CompiledDFA, alphabet: list) -> list:
+    """Para cada símbolo de alphabet, su columna en dfa o -1 si no lo tiene"""
+    index = {c: i for i, c in enumerate(dfa.alphabet)}
+    return [index.get(c, -1) for c in alphabet]
+
+
+def distinguishing_word(dfa_a: CompiledDFA, dfa_b: CompiledDFA):
+    """Algoritmo de Hopcroft y Karp: recorre en anchura las parejas de estados
+    de los dos autómatas uniendo en un DisjointSetUnion las que se suponen
+    equivalentes. Devuelve None si los autómatas aceptan el mismo lenguaje y, si
+    no, una palabra de longitud mínima (lista de símbolos) que acepta solo uno.
+    Los símbolos que falten en un autómata llevan a un estado de error virtual.
+    """
+    alphabet = sorted(set(dfa_a.alphabet) | set(dfa_b.alphabet))
+    columns_a = _columns(dfa_a, alphabet)
+    columns_b = _columns(dfa_b, alphabet)
+    n_a = dfa_a.n_states()
+    n_b = dfa_b.n_states()
+    k_a = dfa_a.n_symbols()
+    k_b = dfa_b.n_symbols()
+    # Los estados n_a y n_b son los estados de error virtuales; los de b se
+    # desplazan n_a + 1 posiciones en el DisjointSetUnion
+    offset = n_a + 1
+    dsu = StateDisjointSetUnion(offset + n_b + 1)
+
+    def is_final(dfa: CompiledDFA, n: int, q: int) -> bool:
+        return q != n and dfa.final[q] != 0
+
+    p, q = dfa_a.initial, dfa_b.initial
+    if is_final(dfa_a, n_a, p) != is_final(dfa_b, n_b, q):
+        return []
+    dsu.join(p, offset + q)
+    # Cada pareja guarda de qué pareja viene y con qué símbolo, para poder
+    # reconstruir la palabra
+    pairs = [(p, q, -1, -1)]
+    i = 0
+    while i < len(pairs):
+        p, q, _, _ = pairs[i]
+        for c in range(0, len(alphabet)):
+            col_a = columns_a[c]
+            col_b = columns_b[c]
+            p_next = n_a if p == n_a or col_a < 0 else dfa_a.transitions[p * k_a + col_a]
+            q_next = n_b if q == n_b or col_b < 0 else dfa_b.transitions[q * k_b + col_b]
+            if dsu.get_representative(p_next) == dsu.get_representative(offset + q_next):
+                continue
+            if is_final(dfa_a, n_a, p_next) != is_final(dfa_b, n_b, q_next):
+                # Primer conflicto: como recorremos en anchura, la palabra es mínima
+                word = [alphabet[c]]
+                j = i
+                while pairs[j][2] >= 0:
+                    word.append(alphabet[pairs[j][3]])
+                    j = pairs[j][2]
+                word.reverse()
+                return word
+            dsu.join(p_next, offset + q_next)
+            pairs.append((p_next, q_next, i, c))
+        i += 1
+    return None
+
+
+def equivalent(afd_a, afd_b) -> tuple:
+    """Comprueba si dos autómatas (Afd o CompiledDFA) aceptan el mismo lenguaje.
+    Devuelve una tupla (equivalentes, palabra), donde palabra es None o una
+    palabra de longitud mínima que distingue a los autómatas."""
+    word = distinguishing_word(_compile(afd_a), _compile(afd_b))
+    return word is None, word
+
+
+class ReferenceChecker:
+    """Compara muchos autómatas con uno de referencia, que se compila una sola vez"""
+
+    def __init__(self, reference) -> None:
+        """reference: autómata de referencia, Afd o CompiledDFA"""
+        self.reference = _compile(reference)
+
+    def check(self, automaton) -> tuple:
+        """Compara automaton con la referencia, como equivalent()"""
+        word = distinguishing_word(self.reference, _compile(automaton))
+        return word is None, word
+
+
+def equivalent_batch(reference, submissions):
+    """Compara cada autómata de submissions con reference. Devuelve un generador
+    con el resultado de cada uno, en el mismo formato que equivalent()."""
+    checker = ReferenceChecker(reference)
+    for automaton in submissions:
+        yield checker.check(automaton)
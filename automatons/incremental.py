@@ -0,0 +1,450 @@
+from array import array
+
+from .auxiliar_classes.compiled_dfa import CompiledDFA as CompiledDFA, NO_SINK as NO_SINK
+from .auxiliar_classes.complete_afd import CompleteAFD as CompleteAFD, ERROR_STATE as ERROR_STATE
+from .auxiliar_classes.minimized_dfa import MinimizedDFA as MinimizedDFA
+from .hopcroft import hopcroft
+from .minimize import number_classes
+
+# Si una edición afecta a más de esta fracción de los estados, la partición se
+# calcula desde cero: recolocarlos uno a uno cuesta más que hopcroft()
+FULL_RUN_FRACTION = 0.25
+# Por debajo de este número de estados afectados nunca se calcula desde cero
+MIN_FULL_RUN_STATES = 1000
+
+
+class IncrementalMinimizer:
+    """Mantiene la partición en clases de equivalencia de un autómata mientras se
+    edita, sin minimizarlo de nuevo tras cada cambio.
+
+    Si la firma de los estados editados (si son finales y la clase de cada
+    sucesor) no cambia, la partición tampoco. Si no, solo puede cambiar el
+    lenguaje de los estados desde los que se llega a un estado editado. Cuando
+    son más de FULL_RUN_FRACTION de todos se vuelve a ejecutar hopcroft(); en
+    autómatas aleatorios, donde casi todos los estados llegan a cualquier otro,
+    es lo habitual. Si son menos, y no forman ningún ciclo entre ellos, se
+    recorren desde los más profundos y cada uno se coloca en la clase que tenga
+    su misma firma, que se busca en una tabla hash; el resto de clases no se
+    tocan. Los que forman un ciclo se colocan juntos: o todos equivalen a clases
+    ya colocadas, o se separan entre ellos con el algoritmo de Hopcroft, con
+    las clases de fuera del ciclo fijas.
+
+    Siempre hay un estado de error explícito, que no se puede editar, y los
+    estados eliminados quedan aislados en su clase.
+    """
+
+    def __init__(self, dfa: CompiledDFA) -> None:
+        """Copia la tabla de dfa y calcula su partición con hopcroft()"""
+        if dfa.outputs is not None:
+            raise ValueError('El minimizador incremental no admite etiquetas de salida')
+        k = dfa.n_symbols()
+        self.alphabet = list(dfa.alphabet)
+        self.states = list(dfa.states)
+        self.transitions = array('i', dfa.transitions)
+        self.final = bytearray(dfa.final)
+        self.initial = dfa.initial
+        self.sink = dfa.sink
+        if self.sink == NO_SINK:
+            self.sink = len(self.states)
+            self.states.append(ERROR_STATE)
+            self.transitions.extend([self.sink] * k)
+            self.final.append(0)
+        self.state_index = {q: i for i, q in enumerate(self.states) if i != self.sink}
+        self.symbol_index = {c: i for i, c in enumerate(self.alphabet)}
+        # Estados con alguna transición a cada estado, una vez por transición.
+        # Las del estado de error no se guardan: nunca se editan
+        self.predecessors = [[] for _ in self.states]
+        for q in range(len(self.states)):
+            for t in self.transitions[q * k:(q + 1) * k]:
+                if t != self.sink:
+                    self.predecessors[t].append(q)
+        self.full_runs = 0
+        self.local_updates = 0
+        # Estados recorridos al actualizar, sin contar los de hopcroft()
+        self.visited = 0
+        self._full_run()
+
+    @classmethod
+    def from_afd(cls, automaton) -> 'IncrementalMinimizer':
+        """Crea el minimizador a partir de un Afd"""
+        return cls(CompiledDFA.from_complete_afd(CompleteAFD(automaton)))
+
+    def _compiled(self) -> CompiledDFA:
+        return CompiledDFA(self.states, self.alphabet, self.transitions, self.final, self.initial, self.sink)
+
+    def _signature(self, q: int) -> tuple:
+        """Si q es final y la clase de cada sucesor"""
+        k = len(self.alphabet)
+        class_of = self.class_of
+        return (self.final[q],) + tuple(class_of[t] for t in self.transitions[q * k:(q + 1) * k])
+
+    def _full_run(self) -> None:
+        """Calcula la partición desde cero y reconstruye la tabla de firmas"""
+        labels = hopcroft(self._compiled())
+        self.class_of = array('i', labels)
+        self.size = [0] * (max(labels) + 1)
+        for c in labels:
+            self.size[c] += 1
+        # Clases vacías, cuyos números se pueden reutilizar
+        self.free = []
+        self._build_signatures()
+        self.full_runs += 1
+
+    def _build_signatures(self) -> None:
+        self.signatures = [None] * len(self.size)
+        self.by_signature = {}
+        for q in range(len(self.states)):
+            c = self.class_of[q]
+            if self.size[c] > 0 and self.signatures[c] is None:
+                self._register(c, self._signature(q))
+
+    def _register(self, c: int, signature: tuple) -> None:
+        self.signatures[c] = signature
+        self.by_signature[signature] = c
+
+    def _new_class(self) -> int:
+        """Número para una clase nueva, reutilizando el de una vacía si la hay"""
+        if self.free:
+            return self.free.pop()
+        self.size.append(0)
+        self.signatures.append(None)
+        return len(self.size) - 1
+
+    def _update(self, edited: list) -> None:
+        """Recoloca los estados desde los que se llega a alguno de edited"""
+        class_of = self.class_of
+        size = self.size
+        if all(self._signature(q) == self.signatures[class_of[q]] for q in edited):
+            # El autómata cociente no cambia, así que sigue siendo mínimo
+            self.visited += len(edited)
+            self.local_updates += 1
+            return
+        # Buscamos hacia atrás los estados afectados, mientras no sean demasiados
+        limit = max(MIN_FULL_RUN_STATES, int(FULL_RUN_FRACTION * len(self.states)))
+        affected = dict.fromkeys(edited)
+        order = list(affected)
+        for q in order:
+            for p in self.predecessors[q]:
+                if p not in affected:
+                    affected[p] = None
+                    order.append(p)
+            if len(order) > limit:
+                self.visited += len(order)
+                self._full_run()
+                return
+        self.visited += len(order)
+        # Sacamos los estados afectados de sus clases; las que se quedan vacías
+        # dejan de estar en la tabla de firmas
+        for q in order:
+            c = class_of[q]
+            size[c] -= 1
+            if size[c] == 0:
+                del self.by_signature[self.signatures[c]]
+                self.signatures[c] = None
+                self.free.append(c)
+        # Colocamos cada componente fuertemente conexa cuando ya están colocados
+        # todos sus sucesores
+        k = len(self.alphabet)
+        for component in self._components(affected):
+            q = component[0]
+            if len(component) == 1 and q not in self.transitions[q * k:(q + 1) * k]:
+                self._place(q)
+            else:
+                self._place_component(component)
+        self.local_updates += 1
+
+    def _components(self, affected: dict) -> list:
+        """Componentes fuertemente conexas de los estados afectados, con las
+        transiciones entre ellos, en orden inverso al topológico (algoritmo de
+        Tarjan, sin recursión)"""
+        k = len(self.alphabet)
+        transitions = self.transitions
+        n = len(affected)
+        index = {}
+        low = {}
+        stack = []
+        components = []
+        for root in affected:
+            if root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            work = [(root, iter(transitions[root * k:(root + 1) * k]))]
+            while work:
+                q, successors = work[-1]
+                for t in successors:
+                    if t not in affected:
+                        continue
+                    i = index.get(t)
+                    if i is None:
+                        index[t] = low[t] = len(index)
+                        stack.append(t)
+                        work.append((t, iter(transitions[t * k:(t + 1) * k])))
+                        break
+                    # Los estados de componentes ya cerradas tienen low = n
+                    if i < low[q] and low[t] < n:
+                        low[q] = i
+                else:
+                    work.pop()
+                    if work:
+                        p = work[-1][0]
+                        if low[q] < low[p]:
+                            low[p] = low[q]
+                    if low[q] == index[q]:
+                        i = len(stack) - 1
+                        while stack[i] != q:
+                            i -= 1
+                        component = stack[i:]
+                        del stack[i:]
+                        for t in component:
+                            low[t] = n
+                        components.append(component)
+        return components
+
+    def _place(self, q: int) -> None:
+        """Coloca q, cuyos sucesores ya están colocados, en la clase con su firma"""
+        signature = self._signature(q)
+        c = self.by_signature.get(signature)
+        if c is None:
+            c = self._new_class()
+            self._register(c, signature)
+        self.class_of[q] = c
+        self.size[c] += 1
+
+    def _place_component(self, component: list) -> None:
+        """Coloca los estados de un ciclo, cuyos sucesores fuera de él ya están
+        colocados. Si uno es equivalente a una clase colocada, lo son todos;
+        si no, se separan entre ellos con hopcroft(), con las clases de fuera
+        fijas."""
+        k = len(self.alphabet)
+        transitions = self.transitions
+        class_of = self.class_of
+        members = dict.fromkeys(component)
+        # Buscamos candidatas a partir de una transición que sale de la
+        # componente. Si va a una clase de un solo estado, solo pueden serlo las
+        # de sus predecesores; si no, miramos todas las clases colocadas
+        way_out = single = None
+        for q in component:
+            for c in range(k):
+                t = transitions[q * k + c]
+                if t in members:
+                    continue
+                if way_out is None:
+                    way_out = (q, c, t)
+                if t != self.sink and self.size[class_of[t]] == 1 and \
+                        (single is None or len(self.predecessors[t]) < len(self.predecessors[single[2]])):
+                    single = (q, c, t)
+        if single is not None:
+            way_out = single
+        signatures = self.signatures
+        if way_out is None:
+            start = component[0]
+            candidates = [d for d, signature in enumerate(signatures) if signature is not None]
+        else:
+            start, c, t = way_out
+            target = class_of[t]
+            if t != self.sink and self.size[target] == 1:
+                candidates = {class_of[p] for p in self.predecessors[t] if transitions[p * k + c] == t}
+            else:
+                candidates = range(len(signatures))
+            candidates = [d for d in candidates if signatures[d] is not None and signatures[d][1 + c] == target]
+        for d in candidates:
+            match = self._match(start, d, members)
+            if match is not None:
+                for q, d in match.items():
+                    class_of[q] = d
+                    self.size[d] += 1
+                return
+        # Ningún estado equivale a una clase colocada: cada clase de fuera es un
+        # estado con bucles y su propia etiqueta, que no se puede unir con nada
+        index = {q: i for i, q in enumerate(component)}
+        outside = {}
+        table = array('i')
+        for q in component:
+            for c in range(k):
+                t = transitions[q * k + c]
+                i = index.get(t)
+                if i is None:
+                    i = outside.setdefault(class_of[t], len(component) + len(outside))
+                table.append(i)
+        for i in range(len(component), len(component) + len(outside)):
+            table.extend([i] * k)
+        final = bytearray(self.final[q] for q in component) + bytearray(len(outside))
+        outputs = [None] * len(component) + list(outside)
+        states = [self.states[q] for q in component] + [None] * len(outside)
+        labels = hopcroft(CompiledDFA(states, self.alphabet, table, final, 0, NO_SINK, None, outputs))
+        classes = {}
+        for q, label in zip(component, labels):
+            c = classes.get(label)
+            if c is None:
+                c = classes[label] = self._new_class()
+            class_of[q] = c
+            self.size[c] += 1
+        for q in component:
+            c = class_of[q]
+            if self.signatures[c] is None:
+                self._register(c, self._signature(q))
+
+    def _match(self, q: int, c: int, members: dict) -> dict:
+        """Intenta poner q en la clase c y a cada estado de members al que se
+        llega desde q en la clase que le corresponde. Devuelve la clase de
+        cada uno, o None si alguna firma no coincide"""
+        k = len(self.alphabet)
+        transitions = self.transitions
+        class_of = self.class_of
+        match = {q: c}
+        pending = [q]
+        while pending:
+            p = pending.pop()
+            signature = self.signatures[match[p]]
+            if signature is None or signature[0] != self.final[p]:
+                return None
+            for a in range(k):
+                t = transitions[p * k + a]
+                expected = signature[1 + a]
+                if t not in members:
+                    if class_of[t] != expected:
+                        return None
+                elif t not in match:
+                    match[t] = expected
+                    pending.append(t)
+                elif match[t] != expected:
+                    return None
+        return match
+
+    def _state(self, name: str) -> int:
+        q = self.state_index.get(name)
+        if q is None:
+            raise ValueError('Estado desconocido: %s' % name)
+        return q
+
+    def _symbol(self, symbol: str) -> int:
+        """Devuelve el índice del símbolo, añadiéndolo al alfabeto si es nuevo"""
+        c = self.symbol_index.get(symbol)
+        if c is None:
+            # Con el símbolo nuevo todos los estados van al de error, así que la
+            # partición no cambia; solo hay que ensanchar la tabla
+            k = len(self.alphabet)
+            transitions = array('i')
+            for q in range(len(self.states)):
+                transitions.extend(self.transitions[q * k:(q + 1) * k])
+                transitions.append(self.sink)
+            self.transitions = transitions
+            c = k
+            self.alphabet.append(symbol)
+            self.symbol_index[symbol] = c
+            self._build_signatures()
+        return c
+
+    def _set_transition(self, q: int, c: int, target: int) -> bool:
+        i = q * len(self.alphabet) + c
+        old = self.transitions[i]
+        if old == target:
+            return False
+        if old != self.sink:
+            self.predecessors[old].remove(q)
+        if target != self.sink:
+            self.predecessors[target].append(q)
+        self.transitions[i] = target
+        return True
+
+    def set_transition(self, state: str, symbol: str, target: str) -> None:
+        """Hace que state vaya a target con symbol. Si target es None, la
+        transición se elimina (pasa a ir al estado de error)"""
+        q = self._state(state)
+        target = self.sink if target is None else self._state(target)
+        if self._set_transition(q, self._symbol(symbol), target):
+            self._update([q])
+
+    def remove_transition(self, state: str, symbol: str) -> None:
+        """Elimina la transición de state con symbol"""
+        self.set_transition(state, symbol, None)
+
+    def set_final(self, state: str, final: bool = True) -> None:
+        """Marca o desmarca state como final"""
+        q = self._state(state)
+        if bool(self.final[q]) != final:
+            self.final[q] = final
+            self._update([q])
+
+    def set_initial(self, state: str) -> None:
+        """Cambia el estado inicial; la partición no cambia"""
+        self.initial = self._state(state)
+
+    def add_state(self, name: str, final: bool = False) -> None:
+        """Añade un estado sin transiciones"""
+        if name in self.state_index:
+            raise ValueError('Estado duplicado: %s' % name)
+        q = len(self.states)
+        self.states.append(name)
+        self.state_index[name] = q
+        self.transitions.extend([self.sink] * len(self.alphabet))
+        self.final.append(0)
+        self.predecessors.append([])
+        # Sin transiciones y no final, es equivalente al estado de error
+        self.class_of.append(self.class_of[self.sink])
+        self.size[self.class_of[self.sink]] += 1
+        if final:
+            self.set_final(name)
+
+    def remove_state(self, state: str) -> None:
+        """Elimina un estado: las transiciones que llegan a él pasan a ir al
+        estado de error"""
+        q = self._state(state)
+        if q == self.initial:
+            raise ValueError('No se puede eliminar el estado inicial')
+        k = len(self.alphabet)
+        edited = list(dict.fromkeys(self.predecessors[q]))
+        for p in edited:
+            for c in range(k):
+                if self.transitions[p * k + c] == q:
+                    self._set_transition(p, c, self.sink)
+        for c in range(k):
+            self._set_transition(q, c, self.sink)
+        self.final[q] = 0
+        del self.state_index[state]
+        self.states[q] = None
+        edited.append(q)
+        self._update(edited)
+
+    def equivalent(self, state_a: str, state_b: str) -> bool:
+        """Devuelve si dos estados aceptan el mismo lenguaje"""
+        return self.class_of[self._state(state_a)] == self.class_of[self._state(state_b)]
+
+    def result(self) -> MinimizedDFA:
+        """Devuelve el autómata mínimo actual, igual que minimize(). Coste O(n·k),
+        sin refinar: se quitan los estados inaccesibles o inútiles y se numeran
+        las clases."""
+        k = len(self.alphabet)
+        transitions = self.transitions
+        empty = self.class_of[self.sink]
+        # Estados accesibles desde el inicial y con lenguaje no vacío, más el inicial
+        reachable = {self.initial: None}
+        queue = [self.initial]
+        for q in queue:
+            for t in transitions[q * k:(q + 1) * k]:
+                if t not in reachable:
+                    reachable[t] = None
+                    queue.append(t)
+        useful = {q for q in queue if q == self.initial or self.class_of[q] != empty}
+        # Como en CompiledDFA.from_complete_afd(), los estados se ordenan por
+        # nombre, incluido el de error si hace falta
+        states = sorted(useful, key=lambda q: self.states[q])
+        if any(t not in useful for q in useful for t in transitions[q * k:(q + 1) * k]):
+            states.append(self.sink)
+            states.sort(key=lambda q: self.states[q])
+        index = {q: i for i, q in enumerate(states)}
+        sink = index.get(self.sink, NO_SINK)
+        n = len(states)
+        table = array('i', [0]) * (n * k)
+        final = bytearray(n)
+        labels = [0] * n
+        for i, q in enumerate(states):
+            final[i] = self.final[q]
+            labels[i] = self.class_of[q]
+            for c in range(k):
+                table[i * k + c] = index.get(transitions[q * k + c], sink)
+        dfa = CompiledDFA([self.states[q] for q in states], list(self.alphabet), table, final,
+                          index[self.initial], sink)
+        class_of, n_classes = number_classes(labels)
+        return MinimizedDFA(dfa, class_of, n_classes)
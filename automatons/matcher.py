@@ -0,0 +1,147 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+from array import array
+
+from .auxiliar_classes.minimized_dfa import MinimizedDFA as MinimizedDFA
+
+
+class Matcher:
+    """Ejecuta un autómata mínimo sobre cadenas de bytes.
+    Cada byte se traduce a su columna con una tabla de 256 entradas (los bytes
+    que no están en el alfabeto van a una columna extra que lleva al estado
+    muerto) y se avanza sobre una tabla plana de transiciones. Los símbolos del
+    autómata tienen que ser caracteres de un byte (código menor que 256); las
+    cadenas str se codifican en latin-1. En cuanto se llega al estado muerto, el
+    del lenguaje vacío, se deja de leer.
+    """
+
+    def __init__(self, result: MinimizedDFA) -> None:
+        """Compila la tabla de result; coste O(n_classes·k + 256)"""
+        n = result.n_classes
+        k = result.n_symbols()
+        # El estado muerto es el no final que solo lleva a sí mismo; si no hay
+        # ninguno se añade uno, para los bytes que no están en el alfabeto
+        self.dead = -1
+        for c in range(n):
+            if not result.is_final(c) and all(result.next_state(c, s) == c for s in range(k)):
+                self.dead = c
+                break
+        n_states = n
+        if self.dead < 0:
+            self.dead = n
+            n_states += 1
+        self.width = k + 1
+        self.transitions = array('i', [self.dead]) * (n_states * self.width)
+        for c in range(n):
+            for s in range(k):
+                self.transitions[c * self.width + s] = result.next_state(c, s)
+        self.final = bytearray(n_states)
+        for c in range(n):
+            self.final[c] = result.is_final(c)
+        self.initial = result.initial
+        # Columna de cada byte
+        self.byte_column = bytearray([k]) * 256 if self.width <= 256 else None
+        lookup = array('i', [k]) * 256
+        for s in range(k):
+            for symbol in result.dfa.symbols_of(s):
+                if len(symbol) == 1 and ord(symbol) < 256:
+                    lookup[ord(symbol)] = s
+        self.lookup = lookup
+        if self.byte_column is not None:
+            for b in range(256):
+                self.byte_column[b] = lookup[b]
+
+    def _columns(self, data) -> bytes:
+        """Traduce data (bytes o str) a columnas, en C cuando caben en un byte"""
+        if isinstance(data, str):
+            try:
+                data = data.encode('latin-1')
+            except UnicodeEncodeError:
+                # Los caracteres de más de un byte no están en el alfabeto
+                lookup = self.lookup
+                missing = self.width - 1
+                return [lookup[code] if code < 256 else missing for code in map(ord, data)]
+        if self.byte_column is not None:
+            return bytes(data).translate(self.byte_column)
+        lookup = self.lookup
+        return [lookup[b] for b in data]
+
+    def run(self, data, state: int = None) -> int:
+        """Devuelve el estado al que se llega leyendo data desde state (por
+        defecto, el inicial). Para en cuanto se llega al estado muerto."""
+        if state is None:
+            state = self.initial
+        columns = self._columns(data)
+        transitions = self.transitions
+        width = self.width
+        dead = self.dead
+        for s in columns:
+            state = transitions[state * width + s]
+            if state == dead:
+                break
+        return state
+
+    def accepts(self, data) -> bool:
+        """Devuelve si el autómata acepta data"""
+        return self.final[self.run(data)] != 0
+
+    def find_all(self, data):
+        """Busca de izquierda a derecha las apariciones de palabras del lenguaje en
+        data, sin solaparse y quedándose con la más larga en cada posición, como
+        re.finditer(). Devuelve un generador de parejas (inicio, fin)."""
+        columns = self._columns(data)
+        transitions = self.transitions
+        width = self.width
+        dead = self.dead
+        final = self.final
+        n = len(columns)
+        start = 0
+        while start <= n:
+            state = self.initial
+            end = start if final[state] else -1
+            i = start
+            while i < n:
+                state = transitions[state * width + columns[i]]
+                if state == dead:
+                    break
+                i += 1
+                if final[state]:
+                    end = i
+            if end < 0:
+                start += 1
+            else:
+                yield start, end
+                # Tras una coincidencia vacía avanzamos una posición
+                start = end if end > start else start + 1
+
+    def accepts_many(self, inputs) -> list:
+        """Comprueba muchas cadenas a la vez con NumPy: las de la misma longitud
+        avanzan juntas, un carácter por paso, y se deja de avanzar cuando todas
+        están en el estado muerto. Devuelve una lista de booleanos."""
+        if np is None:
+            raise ImportError('accepts_many() necesita NumPy')
+        table = np.frombuffer(self.transitions, dtype=np.int32).reshape(-1, self.width)
+        final = np.frombuffer(bytes(self.final), dtype=np.uint8).astype(bool)
+        lookup = np.frombuffer(self.lookup, dtype=np.int32)
+        result = [False] * len(inputs)
+        by_length = {}
+        for i, data in enumerate(inputs):
+            if isinstance(data, str):
+                try:
+                    data = data.encode('latin-1')
+                except UnicodeEncodeError:
+                    continue
+            by_length.setdefault(len(data), []).append((i, data))
+        for length, group in by_length.items():
+            columns = lookup[np.frombuffer(b''.join(data for _, data in group), dtype=np.uint8)]
+            columns = columns.reshape(len(group), length)
+            states = np.full(len(group), self.initial, dtype=np.int32)
+            for j in range(length):
+                states = table[states, columns[:, j]]
+                if (states == self.dead).all():
+                    break
+            for (i, _), accepted in zip(group, final[states].tolist()):
+                result[i] = accepted
+        return result
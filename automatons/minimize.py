@@ -1,94 +1,231 @@
+from array import array
+
 from .auxiliar_classes.complete_afd import CompleteAFD as CompleteAFD
+from .auxiliar_classes.compiled_dfa import CompiledDFA as CompiledDFA, initial_partition as initial_partition
+from .auxiliar_classes.minimized_dfa import MinimizedDFA as MinimizedDFA
 from .auxiliar_classes.disjoint_set_union import StateDisjointSetUnion as StateDisjointSetUnion
-from .auxiliar_classes.state_pair import StatePair as StatePair
-from tabulate import tabulate
+from .auxiliar_classes.pair_table import PairTable as PairTable, pair_index as pair_index
+from .cache import PartitionCache as PartitionCache, canonical_form as canonical_form, \
+    canonical_partition as canonical_partition
+from .alphabet import compile_compressed
+from .auxiliar_classes.sparse_dfa import SparseDFA as SparseDFA
+from .hopcroft import hopcroft
+from .stats import MinimizationStats as MinimizationStats, phase as phase
+from .valmari import valmari
+from .moore_numpy import moore_numpy
 
 
-def triangular_table(complete_automaton: CompleteAFD) -> dict:
-    accessible_states = complete_automaton.get_accessible_states_list()
-    # Ordenamos para saber como acceder a la tabla triangular
-    accessible_states.sort()
-    # Inicializamos la tabla triangular
-    table = {}
-    for i in range(0, len(accessible_states)):
-        table[accessible_states[i]] = {}
-        for j in range(0, i):
-            table[accessible_states[i]][accessible_states[j]] = StatePair()
-    # Arrancamos el algoritmo
-    for q_a in accessible_states:
-        for q_b in table[q_a]:
-            if complete_automaton.is_final(q_a) != complete_automaton.is_final(q_b):
-                table[q_a][q_b].mark()
-            else:
-                for c in complete_automaton.get_alphabet():
-                    q_a_next = complete_automaton.get_next_state(q_a, c)
-                    q_b_next = complete_automaton.get_next_state(q_b, c)
-                    # Si son el mismo estado no podemos saber nada
-                    if q_a_next == q_b_next:
-                        continue
-                    # Cambiamos los índices para no salirnos de la tabla
-                    if q_a_next < q_b_next:
-                        temp = q_a_next
-                        q_a_next = q_b_next
-                        q_b_next = temp
-                    # Si los nuevos estados son distinguibles, los anteriores
-                    # también
-                    if table[q_a_next][q_b_next].is_marked():
-                        table[q_a][q_b].mark()
-                        break
-                    # Si no, los añadimos a su lista
-                    else:
-                        table[q_a_next][q_b_next].add_edge(table[q_a][q_b])
+def _successor_pairs(dfa: CompiledDFA, q_a: int, q_b: int, final) -> list:
+    """Devuelve los números de las parejas a las que llegan q_a y q_b con cada
+    símbolo, o None si alguna de ellas ya es distinguible por estar en bloques
+    iniciales distintos (final es initial_partition(dfa))."""
+    k = dfa.n_symbols()
+    transitions = dfa.transitions
+    pairs = []
+    for c in range(0, k):
+        q_a_next = transitions[q_a * k + c]
+        q_b_next = transitions[q_b * k + c]
+        # Si son el mismo estado no podemos saber nada
+        if q_a_next == q_b_next:
+            continue
+        # Si los nuevos estados son distinguibles, los anteriores también
+        if final[q_a_next] != final[q_b_next]:
+            return None
+        # Cambiamos los índices para no salirnos de la tabla
+        if q_a_next < q_b_next:
+            pairs.append(pair_index(q_b_next, q_a_next))
+        else:
+            pairs.append(pair_index(q_a_next, q_b_next))
+    return pairs
+
+
+def triangular_table(dfa: CompiledDFA, stats: MinimizationStats = None) -> PairTable:
+    n = dfa.n_states()
+    # Bloque inicial de cada estado: si es final y, si las tiene, su etiqueta
+    final = initial_partition(dfa)
+    # Inicializamos la tabla triangular: un bit por cada pareja q_a > q_b
+    table = PairTable(n)
+    # Primera pasada: marcamos las parejas distinguibles directamente y contamos
+    # cuántas parejas dependen de cada una
+    offsets = array('q', bytes(8 * (table.n_pairs + 1)))
+    for q_a in range(0, n):
+        for q_b in range(0, q_a):
+            p = pair_index(q_a, q_b)
+            if final[q_a] != final[q_b]:
+                table.mark_index(p)
+                continue
+            pairs = _successor_pairs(dfa, q_a, q_b, final)
+            if pairs is None:
+                table.mark_index(p)
+                continue
+            for next_p in pairs:
+                offsets[next_p + 1] += 1
+    for p in range(0, table.n_pairs):
+        offsets[p + 1] += offsets[p]
+    # Segunda pasada: guardamos las dependencias en formato CSR. Usamos offsets
+    # como cursor de escritura y después lo desplazamos a su sitio
+    edges = array('I' if table.n_pairs < 2 ** 32 else 'q')
+    edges.frombytes(bytes(edges.itemsize * offsets[table.n_pairs]))
+    for q_a in range(0, n):
+        for q_b in range(0, q_a):
+            p = pair_index(q_a, q_b)
+            if table.is_marked_index(p):
+                continue
+            for next_p in _successor_pairs(dfa, q_a, q_b, final):
+                edges[offsets[next_p]] = p
+                offsets[next_p] += 1
+    for p in range(table.n_pairs, 0, -1):
+        offsets[p] = offsets[p - 1]
+    offsets[0] = 0
+    table.set_dependencies(offsets, edges)
+    # Propagamos las marcas: si una pareja es distinguible, también lo son las
+    # que dependen de ella
+    for p in range(0, table.n_pairs):
+        if table.is_marked_index(p):
+            table.mark(p)
+    if stats is not None:
+        stats.count('pairs_examined', table.n_pairs)
+        stats.count('pairs_marked', table.n_marked())
+        stats.count('dependency_edges', offsets[table.n_pairs])
     return table
 
 
-def minimize(automaton) -> None:
+def minimize(automaton, algorithm: str = 'table', cache: PartitionCache = None,
+             stats: MinimizationStats = None, compress_alphabet: bool = False, workers: int = None,
+             outputs: dict = None) -> MinimizedDFA:
+    if stats is not None and hasattr(automaton, 'tiempos'):
+        # El Afd ya viene cargado; apuntamos lo que tardó
+        stats.add_time('load', automaton.tiempos['total'])
     # Completamos el autómata a través de una clase wrapper que nos
     # abstrae de lo que hace y nos proporciona las mismas funciones
-    # que un autómata normal.
-    complete_automaton = CompleteAFD(automaton)
-    # Obtenemos una lista con los estados accesibles
-    accessible_states = complete_automaton.get_accessible_states_list()
-    # Aplicamos el algoritmo de la tabla triangular
-    table = triangular_table(complete_automaton)
-    # Usamos un DisjointSetUnion para crear las clases de equivalencia
-    dsu = StateDisjointSetUnion(complete_automaton)
-    # Unimos todos los estados no distinguibles
-    for q_a in accessible_states:
-        for q_b in table[q_a]:
-            if not table[q_a][q_b].is_marked():
-                dsu.join(q_a, q_b)
-    # Usamos un diccionario que lleve cada representante de su clase de
-    # equivalencia a su nuevo estado
-    dic_representatives = dsu.dic_representative_to_new_state()
-    # Formamos la tabla
-    # La primera fila es el encabezado
-    header = ['Name']
-    # Añadimos al encabezado los elementos del alfabeto
-    for c in complete_automaton.get_alphabet():
-        header.append(c)
-    # Ahora creamos la tabla en sí, y la guardamos en values
-    values = []
-    # Para cada estado representante de su clase
-    for key in dic_representatives.keys():
-        # Añadimos al nombre de la clase de estados'->' ó '#' si es inicial y final, respectivamente
-        suffix = ''
-        if dic_representatives[key]['initial']:
-            suffix += '->'
-        if dic_representatives[key]['final']:
-            suffix += '#'
-        # Creamos una lista que comienza con el nombre de la clase de estados
-        lst = [suffix + dic_representatives[key]['str']]
-        # Para cada elemento del alfabeto, guardamos en la lista la clase de estados a la que nos lleva
-        # desde el estado actual
-        for c in complete_automaton.get_alphabet():
-            # Tomamos el representante de nuestra clase, vemos a qué estado lleva, el cual guardamos
-            # en new_representative
-            new_representative = dsu.get_representative(complete_automaton.get_next_state(
-                key, c))
-            # Obtenemos la clase de estados a la que representa new_representative y la añadimos a la lista
-            lst.append(dic_representatives[new_representative]['str'])
-        # Al final añadimos a la tabla la fila de la clase de estados actual.
-        values.append(lst)
-    # Utilizamos la librería tabulate para formatear la tabla
-    print(tabulate(values, header, tablefmt='orgtbl'))
+    # que un autómata normal. Si los estados tienen etiquetas de salida (outputs
+    # o las <label> del fichero), la partición inicial las separa
+    with phase(stats, 'complete'):
+        complete_automaton = CompleteAFD(automaton, outputs)
+    dfa = compile_automaton(complete_automaton, algorithm, compress_alphabet, stats)
+    return minimize_compiled(dfa, algorithm, cache, stats, workers)
+
+
+def compile_automaton(complete_automaton: CompleteAFD, algorithm: str, compress_alphabet: bool = False,
+                      stats: MinimizationStats = None):
+    """Numera estados y símbolos una sola vez; a partir de aquí todos los
+    algoritmos trabajan con índices enteros. El algoritmo de Valmari trabaja
+    sobre el autómata parcial (un SparseDFA), sin completar sus transiciones.
+    Con compress_alphabet, los símbolos que se comportan igual en todos los
+    estados comparten columna."""
+    with phase(stats, 'compile'):
+        if compress_alphabet:
+            dfa = compile_compressed(complete_automaton, sparse=algorithm == 'valmari')
+        elif algorithm == 'valmari':
+            dfa = SparseDFA.from_complete_afd(complete_automaton)
+        else:
+            dfa = CompiledDFA.from_complete_afd(complete_automaton)
+    if stats is not None:
+        stats.count('states_reachable', complete_automaton.n_reachable)
+        stats.count('states_useful', complete_automaton.n_useful)
+        stats.count('symbols', len(complete_automaton.get_alphabet()))
+        stats.count('symbol_classes', dfa.n_symbols())
+    return dfa
+
+
+def number_classes(labels) -> tuple:
+    """Numera las clases de una partición dada como una etiqueta por estado.
+    Las clases se numeran por orden de su mayor estado, que es el orden en el que
+    siempre ha listado las clases la tabla triangular. Devuelve la clase de cada
+    estado y el número de clases, en dos pasadas lineales."""
+    n = len(labels)
+    # Mayor estado de cada clase
+    last = {}
+    for q in range(0, n):
+        last[labels[q]] = q
+    class_ids = {}
+    class_of = array('i', [0]) * n
+    for q in range(0, n):
+        label = labels[q]
+        if last[label] == q:
+            class_ids[label] = len(class_ids)
+    for q in range(0, n):
+        class_of[q] = class_ids[labels[q]]
+    return class_of, len(class_ids)
+
+
+def equivalence_classes(dfa: CompiledDFA, algorithm: str = 'table', cache: PartitionCache = None,
+                        stats: MinimizationStats = None, workers: int = None) -> tuple:
+    """Aplica el algoritmo de minimización indicado y devuelve la clase de
+    equivalencia de cada estado y el número de clases. Si se pasa una caché y
+    el autómata ya está en ella no se ejecuta ningún algoritmo. dfa puede ser un
+    SparseDFA solo con el algoritmo 'valmari', y entonces sin caché. workers es
+    el número de procesos del algoritmo 'moore-parallel'."""
+    n = dfa.n_states()
+    if isinstance(dfa, SparseDFA):
+        if algorithm != 'valmari':
+            raise ValueError('El algoritmo %s necesita un autómata completo' % algorithm)
+        if cache is not None:
+            raise ValueError('La caché necesita un autómata completo')
+    if stats is not None:
+        stats.count('states', n)
+    if cache is not None:
+        with phase(stats, 'cache'):
+            key, index = canonical_form(dfa)
+            partition = cache.load(key, n)
+        if stats is not None:
+            stats.count('cache_hit', partition is not None)
+        if partition is not None:
+            # Pasamos la partición de numeración canónica a la del autómata
+            with phase(stats, 'dsu'):
+                return number_classes([partition[index[q]] for q in range(0, n)])
+    if algorithm == 'table':
+        # Aplicamos el algoritmo de la tabla triangular
+        with phase(stats, 'refine'):
+            table = triangular_table(dfa, stats)
+        # Usamos un DisjointSetUnion para unir todos los estados no distinguibles
+        with phase(stats, 'dsu'):
+            dsu = StateDisjointSetUnion(n)
+            for q_a in range(0, n):
+                for q_b in range(0, q_a):
+                    if not table.is_marked(q_a, q_b):
+                        dsu.join(q_a, q_b)
+            class_of, n_classes = number_classes(dsu.partition())
+    elif algorithm in ('hopcroft', 'moore-numpy', 'moore-parallel'):
+        # Aplicamos el algoritmo de Hopcroft o el de Moore vectorizado, en uno
+        # o en varios procesos, que ya nos dan la partición
+        with phase(stats, 'refine'):
+            if algorithm == 'hopcroft':
+                labels = hopcroft(dfa, stats)
+            elif algorithm == 'moore-numpy':
+                labels = moore_numpy(dfa, stats)
+            else:
+                # moore_parallel usa multiprocessing.shared_memory (Python 3.8 o
+                # posterior), así que solo se importa cuando se pide
+                from .moore_parallel import moore_parallel
+                labels = moore_parallel(dfa, workers, stats)
+        with phase(stats, 'dsu'):
+            class_of, n_classes = number_classes(labels)
+    elif algorithm == 'valmari':
+        # Aplicamos el algoritmo de Valmari sobre las transiciones que existen
+        if not isinstance(dfa, SparseDFA):
+            dfa = SparseDFA.from_compiled(dfa)
+        with phase(stats, 'refine'):
+            labels = valmari(dfa, stats)
+        with phase(stats, 'dsu'):
+            class_of, n_classes = number_classes(labels)
+    else:
+        raise ValueError('Algoritmo de minimización desconocido: ' + algorithm)
+    if cache is not None:
+        # Guardamos la clase de cada estado en numeración canónica
+        with phase(stats, 'cache'):
+            cache.store(key, canonical_partition(class_of, index))
+    return class_of, n_classes
+
+
+def minimize_compiled(dfa: CompiledDFA, algorithm: str = 'table', cache: PartitionCache = None,
+                      stats: MinimizationStats = None, workers: int = None) -> MinimizedDFA:
+    """Minimiza un autómata ya compilado, por ejemplo uno cargado con
+    load_binary(), y devuelve el autómata mínimo. Si se pasa stats, se anotan en
+    él los tiempos de cada fase y los contadores de los algoritmos."""
+    class_of, n_classes = equivalence_classes(dfa, algorithm, cache, stats, workers)
+    with phase(stats, 'result'):
+        result = MinimizedDFA(dfa, class_of, n_classes)
+    if stats is not None:
+        stats.count('classes', n_classes)
+    return result
@@ -0,0 +1,42 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .auxiliar_classes.compiled_dfa import CompiledDFA as CompiledDFA, initial_partition as initial_partition
+from .stats import MinimizationStats as MinimizationStats
+
+
+def moore_numpy(dfa: CompiledDFA, stats: MinimizationStats = None) -> list:
+    """Algoritmo de Moore vectorizado con NumPy.
+    La partición se guarda como un array con el bloque de cada estado. En cada
+    ronda la firma de un estado es su bloque y el bloque de cada sucesor, y los
+    bloques se renumeran con np.unique. Termina cuando el número de bloques no
+    cambia. Devuelve la partición igual que hopcroft(). Si se pasa stats,
+    cuenta las rondas.
+    """
+    if np is None:
+        raise ImportError('El algoritmo moore-numpy necesita NumPy')
+    n = dfa.n_states()
+    k = dfa.n_symbols()
+    # Vista n×k de la tabla de transiciones, sin copiarla
+    table = np.frombuffer(dfa.transitions, dtype=np.int32).reshape(n, k)
+    # Partición inicial: estados finales y no finales, o un bloque por etiqueta
+    blocks = np.asarray(initial_partition(dfa)).astype(np.int64)
+    n_blocks = len(np.unique(blocks))
+    signature = np.empty((n, k + 1), dtype=np.int64)
+    rounds = 0
+    while True:
+        rounds += 1
+        signature[:, 0] = blocks
+        signature[:, 1:] = blocks[table]
+        _, new_blocks = np.unique(signature, axis=0, return_inverse=True)
+        new_blocks = new_blocks.reshape(n)
+        new_n_blocks = int(new_blocks.max()) + 1 if n else 0
+        blocks = new_blocks
+        if new_n_blocks == n_blocks:
+            break
+        n_blocks = new_n_blocks
+    if stats is not None:
+        stats.count('rounds', rounds)
+    return blocks.tolist()
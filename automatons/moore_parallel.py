@@ -0,0 +1,112 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from .auxiliar_classes.compiled_dfa import CompiledDFA as CompiledDFA, initial_partition as initial_partition
+from .moore_numpy import moore_numpy
+from .stats import MinimizationStats as MinimizationStats
+
+# Con menos estados por proceso no compensa repartir el trabajo
+MIN_STATES_PER_WORKER = 50000
+
+# Vistas de la memoria compartida en cada proceso del pool
+_shared = {}
+
+
+def _attach(names: tuple, n: int, k: int) -> None:
+    """Inicializa un proceso del pool: abre los bloques de memoria compartida"""
+    table, blocks, local = (shared_memory.SharedMemory(name) for name in names)
+    # Guardamos los SharedMemory para que no se cierren mientras se usan sus vistas
+    _shared['memory'] = (table, blocks, local)
+    _shared['table'] = np.ndarray((n, k), dtype=np.int32, buffer=table.buf)
+    _shared['blocks'] = np.ndarray(n, dtype=np.int64, buffer=blocks.buf)
+    _shared['local'] = np.ndarray(n, dtype=np.int64, buffer=local.buf)
+
+
+def _chunk_signatures(start: int, end: int):
+    """Calcula las firmas de los estados start..end-1 y las numera dentro del
+    trozo. Escribe el número de cada estado en la memoria compartida y devuelve
+    las firmas distintas, ordenadas."""
+    blocks = _shared['blocks']
+    table = _shared['table'][start:end]
+    signature = np.empty((end - start, table.shape[1] + 1), dtype=np.int64)
+    signature[:, 0] = blocks[start:end]
+    signature[:, 1:] = blocks[table]
+    unique, inverse = np.unique(signature, axis=0, return_inverse=True)
+    _shared['local'][start:end] = inverse.reshape(-1)
+    return unique
+
+
+def moore_parallel(dfa: CompiledDFA, workers: int = None, stats: MinimizationStats = None,
+                   min_states_per_worker: int = MIN_STATES_PER_WORKER) -> list:
+    """Algoritmo de Moore repartido entre varios procesos.
+    La tabla de transiciones y el bloque de cada estado están en memoria
+    compartida. En cada ronda cada proceso calcula las firmas de un rango de
+    estados (igual que moore_numpy()) y las numera dentro de su rango; después
+    se juntan las firmas distintas de todos los rangos con np.unique, que las
+    ordena, así que la numeración no depende del reparto. El resultado es
+    idéntico al de moore_numpy(). Por defecto se usa un proceso por CPU; con
+    autómatas pequeños o un solo proceso se llama directamente a moore_numpy().
+    Cada proceso recibe al menos min_states_per_worker estados, así que por
+    debajo de 2 * min_states_per_worker el cálculo es secuencial; el número de
+    procesos usado de verdad se suma al contador 'workers' de stats.
+    """
+    if np is None:
+        raise ImportError('El algoritmo moore-parallel necesita NumPy')
+    n = dfa.n_states()
+    k = dfa.n_symbols()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, n // max(min_states_per_worker, 1))
+    if workers <= 1 or k == 0:
+        if stats is not None:
+            stats.count('workers', 1)
+        return moore_numpy(dfa, stats)
+    # Rangos de estados de cada proceso, siempre los mismos
+    bounds = [n * i // workers for i in range(workers + 1)]
+    chunks = list(zip(bounds, bounds[1:]))
+    memory = []
+    try:
+        for size in (4 * n * k, 8 * n, 8 * n):
+            memory.append(shared_memory.SharedMemory(create=True, size=size))
+        table = np.ndarray((n, k), dtype=np.int32, buffer=memory[0].buf)
+        blocks = np.ndarray(n, dtype=np.int64, buffer=memory[1].buf)
+        local = np.ndarray(n, dtype=np.int64, buffer=memory[2].buf)
+        table[:] = np.frombuffer(dfa.transitions, dtype=np.int32).reshape(n, k)
+        # Partición inicial: estados finales y no finales, o un bloque por etiqueta
+        blocks[:] = np.asarray(initial_partition(dfa))
+        n_blocks = len(np.unique(blocks))
+        rounds = 0
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                 initargs=(tuple(m.name for m in memory), n, k)) as pool:
+            while True:
+                rounds += 1
+                uniques = list(pool.map(_chunk_signatures, *zip(*chunks)))
+                # Numeramos las firmas de todos los rangos juntas y traducimos
+                # la numeración de cada rango a la global
+                merged, global_of = np.unique(np.concatenate(uniques), axis=0, return_inverse=True)
+                global_of = global_of.reshape(-1)
+                new_blocks = np.empty(n, dtype=np.int64)
+                offset = 0
+                for (start, end), unique in zip(chunks, uniques):
+                    new_blocks[start:end] = global_of[offset + local[start:end]]
+                    offset += len(unique)
+                blocks[:] = new_blocks
+                if len(merged) == n_blocks:
+                    break
+                n_blocks = len(merged)
+        result = blocks.tolist()
+        # Soltamos las vistas antes de cerrar la memoria compartida
+        del table, blocks, local
+    finally:
+        for m in memory:
+            m.close()
+            m.unlink()
+    if stats is not None:
+        stats.count('rounds', rounds)
+        stats.count('workers', workers)
+    return result
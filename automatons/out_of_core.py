@@ -0,0 +1,156 @@
+"""Minimización de autómatas que no caben en memoria.
+
+La tabla de transiciones se lee de un fichero binario (load_binary() la proyecta
+en memoria con mmap, sin copiarla) y el bloque de cada estado y el resto de
+arrays de n enteros se guardan en ficheros proyectados en memoria. El algoritmo
+de Moore recorre los estados por trozos: para cada trozo calcula las firmas
+(como moore_numpy()) y las numera dentro del trozo, y después junta las firmas
+distintas de todos los trozos. El tamaño de los trozos sale de memory_limit.
+Solo tienen que caber en memoria las firmas distintas de una ronda, es decir,
+del orden del número de clases del autómata mínimo.
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+import os
+import tempfile
+from array import array
+
+from .auxiliar_classes.compiled_dfa import CompiledDFA as CompiledDFA, initial_partition as initial_partition
+from .auxiliar_classes.minimized_dfa import MinimizedDFA as MinimizedDFA
+from .stats import MinimizationStats as MinimizationStats, phase as phase
+
+# Límite de memoria por defecto: 1 GiB
+DEFAULT_MEMORY_LIMIT = 1024 * 1024 * 1024
+
+
+def chunk_size(k: int, memory_limit: int) -> int:
+    """Número de estados por trozo. Por cada estado de un trozo se guardan su
+    fila de la tabla (k int32), su firma (k + 1 int64) y las copias que hace
+    np.unique al ordenarla (unas tres más)."""
+    return max(1024, memory_limit // (4 * k + 4 * 8 * (k + 1)))
+
+
+def _chunks(n: int, size: int):
+    for start in range(0, n, size):
+        yield start, min(start + size, n)
+
+
+def _rows(signatures):
+    """Vista de una matriz de firmas como un vector de registros, que se
+    comparan fila a fila en el mismo orden en que las ordena np.unique"""
+    signatures = np.ascontiguousarray(signatures)
+    fields = [('f%d' % i, signatures.dtype) for i in range(signatures.shape[1])]
+    return signatures.view(np.dtype(fields)).reshape(-1)
+
+
+def _merge(merged, pending: list):
+    """Une las firmas distintas ya juntadas con las de pending, ordenadas"""
+    if len(merged) == 0 and len(pending) == 1:
+        # Cada trozo ya viene ordenado y sin repeticiones
+        return pending[0]
+    return np.unique(np.concatenate([merged] + pending), axis=0)
+
+
+def moore_out_of_core(dfa: CompiledDFA, memory_limit: int = DEFAULT_MEMORY_LIMIT, directory: str = None,
+                      stats: MinimizationStats = None):
+    """Algoritmo de Moore por trozos, con la partición en ficheros proyectados
+    en memoria dentro de directory. Da la misma partición que moore_numpy(),
+    pero como un np.memmap de n enteros en lugar de una lista."""
+    if np is None:
+        raise ImportError('El algoritmo moore-out-of-core necesita NumPy')
+    n = dfa.n_states()
+    k = dfa.n_symbols()
+    size = chunk_size(k, memory_limit)
+    table = np.frombuffer(dfa.transitions, dtype=np.int32).reshape(n, k)
+    blocks = np.memmap(os.path.join(directory, 'blocks'), dtype=np.int32, mode='w+', shape=(n,))
+    new_blocks = np.memmap(os.path.join(directory, 'new_blocks'), dtype=np.int32, mode='w+', shape=(n,))
+    local = np.memmap(os.path.join(directory, 'local'), dtype=np.int32, mode='w+', shape=(n,))
+    # Partición inicial: estados finales y no finales, o un bloque por etiqueta
+    initial = np.asarray(initial_partition(dfa))
+    blocks[:] = initial
+    n_blocks = len(np.unique(initial))
+    rounds = 0
+    while True:
+        rounds += 1
+        # Primera pasada: firmas de cada trozo, numeradas dentro del trozo
+        uniques = []
+        merged = np.empty((0, k + 1), dtype=np.int64)
+        pending = []
+        n_pending = 0
+        for start, end in _chunks(n, size):
+            signature = np.empty((end - start, k + 1), dtype=np.int64)
+            signature[:, 0] = blocks[start:end]
+            signature[:, 1:] = blocks[table[start:end]]
+            unique, inverse = np.unique(signature, axis=0, return_inverse=True)
+            local[start:end] = inverse.reshape(-1)
+            uniques.append(unique)
+            # Juntamos las firmas distintas cuando las pendientes son tantas
+            # como las ya juntadas, para no ordenar merged en cada trozo
+            pending.append(unique)
+            n_pending += len(unique)
+            if n_pending >= max(len(merged), size):
+                merged = _merge(merged, pending)
+                pending = []
+                n_pending = 0
+        if pending:
+            merged = _merge(merged, pending)
+        # Segunda pasada: numeración global, que por ser ordenada no depende
+        # del tamaño de los trozos
+        merged_rows = _rows(merged)
+        for (start, end), unique in zip(_chunks(n, size), uniques):
+            global_ids = np.searchsorted(merged_rows, _rows(unique)).astype(np.int32)
+            new_blocks[start:end] = global_ids[local[start:end]]
+        blocks, new_blocks = new_blocks, blocks
+        if len(merged) == n_blocks:
+            break
+        n_blocks = len(merged)
+    if stats is not None:
+        stats.count('rounds', rounds)
+        stats.count('chunks', -(-n // size))
+    return blocks
+
+
+def _number_classes(labels, n_labels: int, memory_limit: int, directory: str) -> tuple:
+    """number_classes() por trozos: numera las clases por orden de su mayor
+    estado y escribe la clase de cada estado en un fichero proyectado"""
+    n = len(labels)
+    size = max(1024, memory_limit // 16)
+    last = np.full(n_labels, -1, dtype=np.int64)
+    for start, end in _chunks(n, size):
+        np.maximum.at(last, labels[start:end], np.arange(start, end))
+    rank = np.empty(n_labels, dtype=np.int32)
+    rank[np.argsort(last)] = np.arange(n_labels, dtype=np.int32)
+    class_of = np.memmap(os.path.join(directory, 'class_of'), dtype=np.int32, mode='w+', shape=(n,))
+    for start, end in _chunks(n, size):
+        class_of[start:end] = rank[labels[start:end]]
+    return class_of, n_labels
+
+
+def minimize_out_of_core(dfa: CompiledDFA, memory_limit: int = DEFAULT_MEMORY_LIMIT, directory: str = None,
+                         stats: MinimizationStats = None) -> MinimizedDFA:
+    """Minimiza un autómata compilado sin cargar en memoria arrays de n
+    enteros, como minimize_compiled(dfa, 'moore-numpy'). Conviene que dfa venga
+    de load_binary(), para que tampoco la tabla de transiciones esté en memoria.
+    Los ficheros temporales se crean en directory (por defecto, el directorio
+    temporal del sistema) y se borran al terminar. Lo único de tamaño n que
+    queda en memoria es la clase de cada estado del resultado, un array('i')."""
+    with tempfile.TemporaryDirectory(dir=directory) as work_directory:
+        if stats is not None:
+            stats.count('states', dfa.n_states())
+        with phase(stats, 'refine'):
+            labels = moore_out_of_core(dfa, memory_limit, work_directory, stats)
+        with phase(stats, 'dsu'):
+            n_labels = int(labels.max()) + 1 if len(labels) else 0
+            mapped, n_classes = _number_classes(labels, n_labels, memory_limit, work_directory)
+            class_of = array('i')
+            for start, end in _chunks(len(mapped), max(1024, memory_limit // 8)):
+                class_of.frombytes(mapped[start:end].tobytes())
+            # Soltamos las proyecciones antes de borrar los ficheros
+            del labels, mapped
+        with phase(stats, 'result'):
+            result = MinimizedDFA(dfa, class_of, n_classes)
+    if stats is not None:
+        stats.count('classes', n_classes)
+    return result
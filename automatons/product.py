@@ -0,0 +1,145 @@
+"""Operaciones booleanas entre autómatas mediante el autómata producto.
+
+Cada estado del producto es una pareja (p, q) de estados de los dos autómatas.
+Solo se construyen las parejas accesibles desde la inicial, en anchura, y cada
+pareja se identifica por el entero p·(n_b + 1) + q, que se usa como clave de un
+diccionario. Las parejas que ya no pueden aceptar ninguna palabra se juntan en
+un único estado de error: las que tienen algún componente en su estado de error
+(en una intersección, por ejemplo) se detectan al construirlas y no se
+exploran, y el resto (como dos estados cuyos lenguajes no se cortan) se
+encuentran al final recorriendo hacia atrás las transiciones desde las finales.
+"""
+from array import array
+
+from .auxiliar_classes.compiled_dfa import CompiledDFA as CompiledDFA, NO_SINK as NO_SINK
+from .auxiliar_classes.complete_afd import ERROR_STATE as ERROR_STATE
+from .auxiliar_classes.minimized_dfa import MinimizedDFA as MinimizedDFA
+from .auxiliar_classes.sparse_dfa import _live_states
+from .equivalence import _columns, _compile
+from .minimize import minimize_compiled
+from .stats import MinimizationStats as MinimizationStats
+
+# Si una pareja es final según si lo es cada uno de sus estados
+OPERATIONS = {
+    'intersection': lambda final_a, final_b: final_a and final_b,
+    'union': lambda final_a, final_b: final_a or final_b,
+    'difference': lambda final_a, final_b: final_a and not final_b,
+    'symmetric-difference': lambda final_a, final_b: final_a != final_b,
+}
+
+
+def product(dfa_a, dfa_b, operation: str = 'intersection', max_states: int = None,
+            stats: MinimizationStats = None) -> CompiledDFA:
+    """Construye el autómata producto de dos autómatas (Afd o CompiledDFA) para
+    la operación indicada: 'intersection', 'union', 'difference' (palabras de a
+    que no están en b) o 'symmetric-difference'. El alfabeto es la unión de los
+    dos; los símbolos que falten en un autómata llevan a su estado de error.
+
+    Los estados se numeran en orden de descubrimiento y se llaman '(p,q)'. Si el
+    resultado supera max_states estados se lanza ValueError. El resultado se
+    puede pasar directamente a minimize_compiled().
+    """
+    if operation not in OPERATIONS:
+        raise ValueError('Operación desconocida: ' + operation)
+    accepts = OPERATIONS[operation]
+    dfa_a = _compile(dfa_a)
+    dfa_b = _compile(dfa_b)
+    if dfa_a.symbol_classes is not None or dfa_b.symbol_classes is not None:
+        raise ValueError('El producto necesita autómatas con el alfabeto sin comprimir')
+    alphabet = sorted(set(dfa_a.alphabet) | set(dfa_b.alphabet))
+    columns_a = _columns(dfa_a, alphabet)
+    columns_b = _columns(dfa_b, alphabet)
+    n_a = dfa_a.n_states()
+    n_b = dfa_b.n_states()
+    k_a = dfa_a.n_symbols()
+    k_b = dfa_b.n_symbols()
+    k = len(alphabet)
+    # Como en distinguishing_word(), los estados n_a y n_b son los estados de
+    # error virtuales; los estados de error explícitos se cambian por ellos
+    sink_a = dfa_a.sink if dfa_a.sink != NO_SINK else n_a
+    sink_b = dfa_b.sink if dfa_b.sink != NO_SINK else n_b
+    # Si un componente en su estado de error basta para que la pareja no acepte nada
+    dead_a = not accepts(False, False) and not accepts(False, True)
+    dead_b = not accepts(False, False) and not accepts(True, False)
+
+    def key(p: int, q: int) -> int:
+        if p == sink_a:
+            p = n_a
+        if q == sink_b:
+            q = n_b
+        if (p == n_a and (dead_a or q == n_b)) or (q == n_b and dead_b):
+            return n_a * (n_b + 1) + n_b
+        return p * (n_b + 1) + q
+
+    dead = n_a * (n_b + 1) + n_b
+    start = key(dfa_a.initial, dfa_b.initial)
+    index = {start: 0}
+    pairs = [start]
+    transitions = array('i')
+    final = bytearray()
+    for pair in pairs:
+        p, q = divmod(pair, n_b + 1)
+        final.append(1 if accepts(p != n_a and dfa_a.is_final(p), q != n_b and dfa_b.is_final(q)) else 0)
+        if pair == dead:
+            # El estado de error solo lleva a sí mismo
+            transitions.extend([index[dead]] * k)
+            continue
+        for c in range(k):
+            col_a = columns_a[c]
+            col_b = columns_b[c]
+            p_next = n_a if p == n_a or col_a < 0 else dfa_a.transitions[p * k_a + col_a]
+            q_next = n_b if q == n_b or col_b < 0 else dfa_b.transitions[q * k_b + col_b]
+            target = key(p_next, q_next)
+            i = index.get(target)
+            if i is None:
+                i = len(pairs)
+                if max_states is not None and i >= max_states:
+                    raise ValueError('El producto supera los %d estados' % max_states)
+                index[target] = i
+                pairs.append(target)
+            transitions.append(i)
+    if stats is not None:
+        stats.count('product_states', len(pairs))
+    # Juntamos en el estado de error las parejas desde las que no se llega a
+    # una final, renumerando las demás en el mismo orden
+    live = _live_states(CompiledDFA(pairs, alphabet, transitions, final, 0))
+    if not all(live):
+        sink = live.count(1)
+        new_index = array('i', [sink]) * len(pairs)
+        kept = []
+        for i in range(len(pairs)):
+            if live[i]:
+                new_index[i] = len(kept)
+                kept.append(i)
+        transitions = array('i', [new_index[transitions[i * k + c]] for i in kept for c in range(k)] + [sink] * k)
+        final = bytearray([final[i] for i in kept] + [0])
+        pairs = [pairs[i] for i in kept] + [dead]
+        index = {dead: sink}
+    states = []
+    for pair in pairs:
+        p, q = divmod(pair, n_b + 1)
+        if pair == dead:
+            states.append(ERROR_STATE)
+        else:
+            states.append('(%s,%s)' % (ERROR_STATE if p == n_a else dfa_a.state_name(p),
+                                       ERROR_STATE if q == n_b else dfa_b.state_name(q)))
+    return CompiledDFA(states, alphabet, transitions, final, 0, index.get(dead, NO_SINK))
+
+
+def fold(automata, operation: str = 'intersection', algorithm: str = 'hopcroft', max_states: int = None,
+         stats: MinimizationStats = None) -> MinimizedDFA:
+    """Combina una lista de autómatas con la operación indicada, de izquierda a
+    derecha. Cada autómata y cada resultado intermedio se minimizan antes de
+    seguir, así que cada producto tiene como mucho tantos estados como el
+    producto de los dos autómatas mínimos. Devuelve el autómata mínimo final."""
+    result = None
+    for automaton in automata:
+        minimal = minimize_compiled(_compile(automaton), algorithm, stats=stats)
+        if result is None:
+            result = minimal
+        else:
+            dfa = product(result.to_compiled(), minimal.to_compiled(), operation, max_states, stats)
+            result = minimize_compiled(dfa, algorithm, stats=stats)
+    if result is None:
+        raise ValueError('No hay autómatas que combinar')
+    return result
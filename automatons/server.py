@@ -0,0 +1,367 @@
+"""Servicio de minimización bajo demanda.
+
+Uso: python -m automatons.server [--host H] [--port P] [--unix RUTA] [-j N] [--max-pending N] [--max-body MiB]
+
+Servidor HTTP/1.1 local (por TCP o por un socket Unix) hecho con asyncio. Las
+peticiones POST /minimize?algorithm=ALGORITMO llevan en el cuerpo un autómata
+JFLAP (XML) o, con Content-Type: application/octet-stream, uno compilado en
+formato .afdb, y reciben el autómata mínimo en JSON (el mismo que escribe
+python -m automatons -f json). GET /stats devuelve las peticiones en cola y en
+curso y los percentiles de latencia.
+
+Todo el trabajo se hace en un pool de N procesos, en tres pasos: analizar el
+autómata y calcular su forma canónica, minimizarlo y escribir el resultado. Las
+peticiones simultáneas de autómatas con la misma forma canónica (aunque cambien
+los nombres o el orden de los estados) comparten una sola minimización. Como
+mucho hay N pasos en el pool; si ya hay --max-pending peticiones sin responder,
+las nuevas se rechazan con 503 en lugar de acumularse.
+"""
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from jflap.Afd import Afd
+from .auxiliar_classes.complete_afd import CompleteAFD
+from .auxiliar_classes.compiled_dfa import CompiledDFA
+from .auxiliar_classes.minimized_dfa import MinimizedDFA
+from .binary_format import load_binary
+from .cache import canonical_form, canonical_partition
+from .minimize import equivalence_classes, number_classes
+from .writers import write_json
+
+# Bucle de eventos de la corrutina que se está ejecutando. En Python 3.6 no
+# existe get_running_loop(), pero dentro de una corrutina get_event_loop()
+# devuelve ese mismo bucle
+_running_loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)
+
+ALGORITHMS = ('table', 'hopcroft', 'moore-numpy', 'moore-parallel', 'valmari')
+# Peticiones sin responder por defecto antes de empezar a rechazar
+DEFAULT_MAX_PENDING = 64
+# Tamaño máximo por defecto del cuerpo de una petición: 64 MiB
+DEFAULT_MAX_BODY = 64 * 1024 * 1024
+# Tamaño máximo de la línea de petición y las cabeceras
+MAX_HEADER = 64 * 1024
+# Latencias que se guardan para los percentiles
+DEFAULT_HISTORY = 1000
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class BadRequest(Exception):
+    """Error en la petición del cliente; se responde con el código status"""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _prepare(body: bytes, binary: bool) -> tuple:
+    """Paso 1, en el pool: analiza el autómata y calcula su forma canónica.
+    Devuelve el hash canónico, el índice canónico de cada estado y el autómata."""
+    if binary:
+        # load_binary() proyecta un fichero en memoria; copiamos las tablas para
+        # poder devolver el autómata al proceso principal
+        with tempfile.NamedTemporaryFile(suffix='.afdb') as f:
+            f.write(body)
+            f.flush()
+            loaded = load_binary(f.name)
+            dfa = CompiledDFA(list(loaded.states), list(loaded.alphabet), array('i', loaded.transitions),
+                              loaded.final, loaded.initial, loaded.sink, loaded.symbol_classes, loaded.outputs)
+            del loaded
+    else:
+        dfa = CompiledDFA.from_complete_afd(CompleteAFD(Afd(io.BytesIO(body))))
+    key, index = canonical_form(dfa)
+    return key, index, dfa
+
+
+def _partition(dfa: CompiledDFA, index: list, algorithm: str) -> array:
+    """Paso 2, en el pool: minimiza y devuelve la partición en numeración
+    canónica, que sirve para cualquier autómata con la misma forma canónica"""
+    class_of, _ = equivalence_classes(dfa, algorithm)
+    return canonical_partition(class_of, index)
+
+
+def _render(dfa: CompiledDFA, index: list, partition: array) -> str:
+    """Paso 3, en el pool: pasa la partición canónica a los estados de dfa y
+    escribe el autómata mínimo en JSON"""
+    class_of, n_classes = number_classes([partition[index[q]] for q in range(0, dfa.n_states())])
+    out = io.StringIO()
+    write_json(MinimizedDFA(dfa, class_of, n_classes), out)
+    return out.getvalue()
+
+
+def percentile(values: list, p: float) -> float:
+    """Percentil p (entre 0 y 100) de values, ya ordenados, por el rango más cercano"""
+    if not values:
+        return None
+    rank = max(1, -(-len(values) * p // 100))
+    return values[int(rank) - 1]
+
+
+class MinimizationServer:
+    """Atiende peticiones de minimización sobre un pool de procesos.
+    Un semáforo limita los pasos en el pool al número de procesos, así que los
+    que esperan forman la cola. Las minimizaciones en curso se guardan por forma
+    canónica y algoritmo, y las peticiones que llegan mientras tanto esperan el
+    mismo resultado en lugar de repetirlo.
+    """
+
+    def __init__(self, workers: int = None, max_pending: int = DEFAULT_MAX_PENDING,
+                 max_body: int = DEFAULT_MAX_BODY, history: int = DEFAULT_HISTORY) -> None:
+        """Crea el pool; workers es el número de procesos (por defecto, uno por CPU)"""
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.max_body = max_body
+        # Los procesos no pueden heredar con fork los sockets de las conexiones
+        # abiertas, porque los clientes no verían el cierre. Desde Python 3.7
+        # se arrancan con spawn; en 3.6 el pool arranca todos sus procesos con
+        # la primera tarea, así que la lanzamos antes de aceptar conexiones
+        if sys.version_info >= (3, 7):
+            self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        else:
+            self.pool = ProcessPoolExecutor(self.workers)
+            self.pool.submit(int).result()
+        self.slots = None
+        # Minimizaciones en curso, por (hash canónico, algoritmo)
+        self.in_flight = {}
+        self.waiting = 0
+        self.running = 0
+        self.pending = 0
+        self.requests = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=history)
+
+    async def _run(self, function, *args):
+        """Ejecuta function en el pool cuando haya un proceso libre"""
+        if self.slots is None:
+            # El semáforo tiene que crearse dentro del bucle de eventos
+            self.slots = asyncio.Semaphore(self.workers)
+        self.waiting += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            return await _running_loop().run_in_executor(self.pool, function, *args)
+        finally:
+            self.running -= 1
+            self.slots.release()
+
+    async def _shared_partition(self, key: str, dfa: CompiledDFA, index: list, algorithm: str) -> array:
+        """Devuelve la partición canónica, calculándola solo si no hay ya una
+        minimización en curso del mismo autómata"""
+        job = self.in_flight.get((key, algorithm))
+        if job is None:
+            job = asyncio.ensure_future(self._run(_partition, dfa, index, algorithm))
+            self.in_flight[(key, algorithm)] = job
+            job.add_done_callback(lambda _: self.in_flight.pop((key, algorithm), None))
+        else:
+            self.coalesced += 1
+        # Si se cancela esta petición, las demás siguen esperando el resultado
+        return await asyncio.shield(job)
+
+    async def minimize(self, body: bytes, binary: bool = False, algorithm: str = 'hopcroft') -> str:
+        """Minimiza el autómata de body (JFLAP o, con binary, .afdb) y devuelve
+        el autómata mínimo en JSON. Lanza BadRequest si no se puede atender."""
+        if algorithm not in ALGORITHMS:
+            raise BadRequest(400, 'Algoritmo de minimización desconocido: ' + algorithm)
+        if len(body) > self.max_body:
+            raise BadRequest(413, 'El autómata ocupa más de %d bytes' % self.max_body)
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise BadRequest(503, 'Hay demasiadas peticiones pendientes')
+        start = time.perf_counter()
+        self.pending += 1
+        self.requests += 1
+        try:
+            try:
+                key, index, dfa = await self._run(_prepare, body, binary)
+            except Exception as error:
+                raise BadRequest(400, 'Problema analizando el autómata: %s' % error)
+            partition = await self._shared_partition(key, dfa, index, algorithm)
+            text = await self._run(_render, dfa, index, partition)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.pending -= 1
+        self.latencies.append(time.perf_counter() - start)
+        return text
+
+    def stats(self) -> dict:
+        """Devuelve el estado de la cola, los contadores y los percentiles de
+        latencia (en milisegundos) de las últimas peticiones atendidas"""
+        latencies = sorted(self.latencies)
+        return {
+            'workers': self.workers,
+            'queue_depth': self.waiting,
+            'running': self.running,
+            'pending': self.pending,
+            'in_flight': len(self.in_flight),
+            'requests': self.requests,
+            'coalesced': self.coalesced,
+            'rejected': self.rejected,
+            'errors': self.errors,
+            'latency_ms': {name: None if value is None else round(value * 1000, 3)
+                           for name, value in (('p50', percentile(latencies, 50)),
+                                               ('p90', percentile(latencies, 90)),
+                                               ('p99', percentile(latencies, 99)))},
+        }
+
+    async def _respond(self, writer, status: int, body: str, headers: dict = None, keep_alive: bool = True) -> None:
+        data = body.encode('utf-8')
+        lines = ['HTTP/1.1 %d %s' % (status, REASONS[status]),
+                 'Content-Type: application/json; charset=utf-8',
+                 'Content-Length: %d' % len(data),
+                 'Connection: %s' % ('keep-alive' if keep_alive else 'close')]
+        for name, value in (headers or {}).items():
+            lines.append('%s: %s' % (name, value))
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + data)
+        await writer.drain()
+
+    async def _request(self, reader) -> tuple:
+        """Lee una petición HTTP. Devuelve el método, la ruta, las cabeceras (en
+        minúsculas) y el cuerpo, o None si el cliente ha cerrado la conexión."""
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError as error:
+            if error.partial.strip():
+                raise BadRequest(400, 'Petición incompleta')
+            return None
+        except asyncio.LimitOverrunError:
+            raise BadRequest(400, 'Cabeceras demasiado largas')
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, version = lines[0].split(' ')
+        except ValueError:
+            raise BadRequest(400, 'Línea de petición incorrecta')
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+        if version == 'HTTP/1.0' and headers.get('connection', '').lower() != 'keep-alive':
+            headers['connection'] = 'close'
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise BadRequest(400, 'Content-Length incorrecto')
+        if length > self.max_body:
+            raise BadRequest(413, 'El autómata ocupa más de %d bytes' % self.max_body)
+        body = await reader.readexactly(length) if length else b''
+        return method, target, headers, body
+
+    async def handle(self, reader, writer) -> None:
+        """Atiende una conexión, con varias peticiones seguidas si el cliente la
+        mantiene abierta"""
+        try:
+            while True:
+                try:
+                    request = await self._request(reader)
+                except BadRequest as error:
+                    # No sabemos dónde acaba la petición, así que cerramos
+                    await self._respond(writer, error.status, json.dumps({'error': str(error)}), keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                url = urlsplit(target)
+                status, extra = 200, None
+                if url.path == '/minimize':
+                    if method != 'POST':
+                        status, text = 405, json.dumps({'error': 'Usa POST'})
+                        extra = {'Allow': 'POST'}
+                    else:
+                        query = parse_qs(url.query)
+                        algorithm = query.get('algorithm', ['hopcroft'])[-1]
+                        binary = headers.get('content-type', '').startswith('application/octet-stream')
+                        try:
+                            text = await self.minimize(body, binary, algorithm)
+                        except BadRequest as error:
+                            status, text = error.status, json.dumps({'error': str(error)}, ensure_ascii=False)
+                            if status == 503:
+                                extra = {'Retry-After': 1}
+                        except Exception as error:
+                            status, text = 500, json.dumps({'error': str(error)}, ensure_ascii=False)
+                elif url.path == '/stats':
+                    if method != 'GET':
+                        status, text = 405, json.dumps({'error': 'Usa GET'})
+                        extra = {'Allow': 'GET'}
+                    else:
+                        text = json.dumps(self.stats())
+                else:
+                    status, text = 404, json.dumps({'error': 'Ruta desconocida: ' + url.path}, ensure_ascii=False)
+                await self._respond(writer, status, text, extra, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def close(self) -> None:
+        """Cierra el pool de procesos"""
+        self.pool.shutdown()
+
+
+async def serve(server: MinimizationServer, host: str = '127.0.0.1', port: int = 8080, path: str = None) -> None:
+    """Atiende peticiones por TCP en host:port o, si se da path, por un socket Unix"""
+    if path is not None:
+        listener = await asyncio.start_unix_server(server.handle, path=path, limit=MAX_HEADER)
+    else:
+        listener = await asyncio.start_server(server.handle, host, port, limit=MAX_HEADER)
+    addresses = ', '.join(str(sock.getsockname()) for sock in listener.sockets)
+    print('Atendiendo peticiones en %s' % addresses, file=sys.stderr, flush=True)
+    try:
+        # Atendemos hasta que se cancele la tarea o se interrumpa el bucle
+        await _running_loop().create_future()
+    finally:
+        listener.close()
+        await listener.wait_closed()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m automatons.server',
+                                     description='Servicio HTTP local de minimización de autómatas.')
+    parser.add_argument('--host', default='127.0.0.1', help='dirección (por defecto, %(default)s)')
+    parser.add_argument('--port', type=int, default=8080, help='puerto (por defecto, %(default)s)')
+    parser.add_argument('--unix', metavar='RUTA', help='atiende en un socket Unix en lugar de por TCP')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(),
+                        help='número de procesos (por defecto, uno por CPU)')
+    parser.add_argument('--max-pending', type=int, default=DEFAULT_MAX_PENDING, metavar='N',
+                        help='peticiones sin responder a partir de las que se rechazan las '
+                             'nuevas con 503 (por defecto, %(default)s)')
+    parser.add_argument('--max-body', type=int, default=DEFAULT_MAX_BODY // (1024 * 1024), metavar='MiB',
+                        help='tamaño máximo de un autómata en MiB (por defecto, %(default)s)')
+    args = parser.parse_args(argv)
+
+    server = MinimizationServer(args.workers, args.max_pending, args.max_body * 1024 * 1024)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(serve(server, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        asyncio.set_event_loop(None)
+        loop.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+import json
+import time
+from contextlib import contextmanager
+
+
+class _Disabled:
+    """Contexto vacío que se usa cuando no se piden estadísticas (como
+    contextlib.nullcontext, que no existe en Python 3.6)"""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_DISABLED = _Disabled()
+
+
+class MinimizationStats:
+    """Estadísticas de una minimización: tiempo de cada fase y contadores.
+    Se pasa como parámetro stats a minimize() y a los algoritmos; si no se pasa
+    no se mide nada. Si se da un callback, se llama como callback(fase, segundos)
+    al terminar cada fase.
+
+    Fases: 'load', 'complete' o 'determinize', 'compile', 'cache', 'refine',
+    'dsu', 'result'.
+    Contadores: 'states_reachable', 'states_useful', 'symbols', 'symbol_classes',
+    'nfa_states', 'subsets', 'product_states', 'states', 'pairs_examined', 'pairs_marked', 'dependency_edges', 'splitters',
+    'rounds', 'workers', 'chunks', 'transitions', 'classes' y 'cache_hit', según el algoritmo.
+    """
+
+    def __init__(self, callback=None) -> None:
+        self.phases = {}
+        self.counters = {}
+        self.callback = callback
+
+    @contextmanager
+    def phase(self, name: str):
+        """Mide el tiempo del bloque with y lo suma a la fase name"""
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """Suma seconds a la fase name"""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+        if self.callback is not None:
+            self.callback(name, seconds)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Suma value al contador name"""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self) -> dict:
+        """Devuelve las fases y los contadores en un diccionario"""
+        return {'phases': dict(self.phases), 'counters': dict(self.counters)}
+
+    def to_json(self) -> str:
+        """Devuelve las estadísticas en JSON"""
+        return json.dumps(self.to_dict())
+
+    def log_line(self) -> str:
+        """Devuelve las estadísticas en una línea de texto clave=valor"""
+        items = ['%s=%.6fs' % item for item in self.phases.items()]
+        items.extend('%s=%d' % item for item in self.counters.items())
+        return ' '.join(items)
+
+
+def phase(stats: MinimizationStats, name: str):
+    """Devuelve el contexto que mide la fase name, o uno vacío si stats es None"""
+    return _DISABLED if stats is None else stats.phase(name)
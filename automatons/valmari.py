@@ -0,0 +1,166 @@
+from array import array
+
+from .auxiliar_classes.compiled_dfa import initial_partition as initial_partition
+from .auxiliar_classes.sparse_dfa import SparseDFA as SparseDFA
+from .stats import MinimizationStats as MinimizationStats
+
+
+class _RefinablePartition:
+    """Partición refinable de Valmari y Lehtinen.
+    Los elementos de cada conjunto ocupan un tramo contiguo de elems, y los
+    marcados se mueven al principio de su tramo. split() separa los marcados de
+    los no marcados de cada conjunto tocado; el nuevo conjunto es siempre la
+    parte más pequeña, así que cada elemento cambia de conjunto O(log n) veces.
+    """
+
+    def __init__(self, elems: array, sizes: list) -> None:
+        """elems: los elementos, agrupados por conjunto; sizes: tamaño de cada conjunto"""
+        self.elems = elems
+        self.location = array('i', [0]) * len(elems)
+        self.set_of = array('i', [0]) * len(elems)
+        self.first = array('i')
+        self.past = array('i')
+        self.marked = array('i')
+        self.touched = []
+        for i, e in enumerate(elems):
+            self.location[e] = i
+        start = 0
+        for size in sizes:
+            if size == 0:
+                continue
+            for i in range(start, start + size):
+                self.set_of[elems[i]] = len(self.first)
+            self.first.append(start)
+            self.past.append(start + size)
+            self.marked.append(0)
+            start += size
+
+    def n_sets(self) -> int:
+        """Devuelve el número de conjuntos"""
+        return len(self.first)
+
+    def mark(self, e: int) -> None:
+        """Marca el elemento e, moviéndolo a la zona de marcados de su conjunto"""
+        s = self.set_of[e]
+        i = self.location[e]
+        j = self.first[s] + self.marked[s]
+        if i < j:
+            return
+        elems = self.elems
+        elems[i] = elems[j]
+        self.location[elems[i]] = i
+        elems[j] = e
+        self.location[e] = j
+        if self.marked[s] == 0:
+            self.touched.append(s)
+        self.marked[s] += 1
+
+    def split(self) -> None:
+        """Separa los elementos marcados de cada conjunto tocado y los desmarca"""
+        first, past, marked = self.first, self.past, self.marked
+        while self.touched:
+            s = self.touched.pop()
+            j = first[s] + marked[s]
+            marked[s] = 0
+            if j == past[s]:
+                continue
+            # El conjunto nuevo es la parte más pequeña
+            z = len(first)
+            if j - first[s] <= past[s] - j:
+                first.append(first[s])
+                past.append(j)
+                first[s] = j
+            else:
+                first.append(j)
+                past.append(past[s])
+                past[s] = j
+            marked.append(0)
+            for i in range(first[z], past[z]):
+                self.set_of[self.elems[i]] = z
+
+
+def valmari(dfa: SparseDFA, stats: MinimizationStats = None) -> list:
+    """Algoritmo de Valmari y Lehtinen para autómatas parciales.
+    Refina a la vez una partición de los estados (bloques) y otra de las
+    transiciones (cuerdas), que empieza agrupándolas por símbolo. Trabaja solo
+    con las transiciones guardadas: el estado de error no tiene ninguna y nunca
+    se toca, así que el coste es O(n + m·log n), con m el número de
+    transiciones, en lugar de O(n·k·log n). Devuelve la partición igual que
+    hopcroft(). Si se pasa stats, cuenta los separadores procesados.
+    """
+    n = dfa.n_states()
+    k = dfa.n_symbols()
+    m = dfa.n_transitions()
+    # El algoritmo supone que desde todos los estados con transiciones se llega
+    # a un final: SparseDFA.from_complete_afd() solo guarda estados útiles y
+    # from_compiled() quita las transiciones a los muertos. Si no hay finales
+    # el lenguaje es vacío y todos los estados son equivalentes
+    labels = initial_partition(dfa)
+    if not any(labels):
+        return [0] * n
+    offsets = dfa.offsets
+    symbols = dfa.symbols
+    targets = dfa.targets
+    tails = array('i', [0]) * m
+    for q in range(n):
+        for t in range(offsets[q], offsets[q + 1]):
+            tails[t] = q
+    # Transiciones que llegan a cada estado, en formato CSR
+    incoming_offsets = array('i', [0]) * (n + 1)
+    for t in range(m):
+        incoming_offsets[targets[t] + 1] += 1
+    for q in range(n):
+        incoming_offsets[q + 1] += incoming_offsets[q]
+    incoming = array('i', [0]) * m
+    position = incoming_offsets[:-1]
+    for t in range(m):
+        q = targets[t]
+        incoming[position[q]] = t
+        position[q] += 1
+    # Cuerdas iniciales: las transiciones agrupadas por símbolo
+    symbol_count = [0] * k
+    for t in range(m):
+        symbol_count[symbols[t]] += 1
+    cord_position = [0] * k
+    for c in range(1, k):
+        cord_position[c] = cord_position[c - 1] + symbol_count[c - 1]
+    cord_elems = array('i', [0]) * m
+    for t in range(m):
+        cord_elems[cord_position[symbols[t]]] = t
+        cord_position[symbols[t]] += 1
+    cords = _RefinablePartition(cord_elems, symbol_count)
+    # Bloques iniciales: todos los estados, separando después los finales (o,
+    # si hay etiquetas de salida, cada bloque inicial salvo el 0). El estado
+    # de error queda con los no finales sin transiciones (si hay alguno)
+    blocks = _RefinablePartition(array('i', range(n)), [n])
+    groups = {}
+    for q in range(n):
+        if labels[q]:
+            groups.setdefault(labels[q], []).append(q)
+    for group in groups.values():
+        for q in group:
+            blocks.mark(q)
+        blocks.split()
+    # Cada cuerda parte los bloques por los orígenes de sus transiciones, y cada
+    # bloque nuevo parte las cuerdas por las transiciones que llegan a él
+    mark_block = blocks.mark
+    mark_cord = cords.mark
+    b = 1
+    c = 0
+    splitters = 0
+    while c < cords.n_sets():
+        for t in cords.elems[cords.first[c]:cords.past[c]]:
+            mark_block(tails[t])
+        blocks.split()
+        c += 1
+        while b < blocks.n_sets():
+            splitters += 1
+            for q in blocks.elems[blocks.first[b]:blocks.past[b]]:
+                for t in incoming[incoming_offsets[q]:incoming_offsets[q + 1]]:
+                    mark_cord(t)
+            cords.split()
+            b += 1
+    if stats is not None:
+        stats.count('splitters', splitters)
+        stats.count('transitions', m)
+    return blocks.set_of.tolist()
@@ -0,0 +1,170 @@
+"""Escritores del autómata mínimo.
+
+Todos reciben un MinimizedDFA y un fichero de texto abierto, y escriben fila a
+fila sin construir el resultado completo en memoria, salvo write_table(), que
+usa tabulate para alinear las columnas.
+"""
+import csv
+import json
+from xml.sax.saxutils import escape, quoteattr
+
+from tabulate import tabulate
+
+from .auxiliar_classes.minimized_dfa import MinimizedDFA as MinimizedDFA
+
+# Separación entre estados al colocarlos en rejilla en JFLAP
+_GRID_STEP = 100
+_GRID_COLUMNS = 20
+
+
+def write_table(result: MinimizedDFA, out) -> None:
+    """Escribe la tabla del autómata mínimo con tabulate, con una fila por clase.
+    La clase inicial se marca con '->' y las finales con '#'."""
+    k = result.n_symbols()
+    header = ['Name'] + list(result.alphabet)
+    values = []
+    for c in range(result.n_classes):
+        suffix = ''
+        if result.is_initial(c):
+            suffix += '->'
+        if result.is_final(c):
+            suffix += '#'
+        row = [suffix + result.class_label(c)]
+        for s in range(k):
+            row.append(result.class_label(result.next_state(c, s)))
+        values.append(row)
+    out.write(tabulate(values, header, tablefmt='orgtbl'))
+    out.write('\n')
+
+
+def _jflap_v6(result: MinimizedDFA, out) -> None:
+    k = result.n_symbols()
+    out.write('<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n')
+    out.write('<structure>\n<type>fa</type>\n<automaton>\n')
+    for c in range(result.n_classes):
+        output = result.output(c)
+        out.write('<state id="%d" name=%s><x>%d</x><y>%d</y>%s%s%s</state>\n' % (
+            c, quoteattr(result.class_name(c)),
+            _GRID_STEP * (c % _GRID_COLUMNS), _GRID_STEP * (c // _GRID_COLUMNS),
+            '<label>%s</label>' % escape(str(output)) if output is not None else '',
+            '<initial/>' if result.is_initial(c) else '',
+            '<final/>' if result.is_final(c) else ''))
+    for c in range(result.n_classes):
+        for s in range(k):
+            # JFLAP no tiene rangos: cada clase de símbolos se escribe símbolo a símbolo
+            for symbol in result.dfa.symbols_of(s):
+                out.write('<transition><from>%d</from><to>%d</to><read>%s</read></transition>\n' % (
+                    c, result.next_state(c, s), escape(symbol)))
+    out.write('</automaton>\n</structure>\n')
+
+
+def _jflap_v8(result: MinimizedDFA, out) -> None:
+    k = result.n_symbols()
+
+    def state(c: int) -> str:
+        return '<name>%s</name><id>%d</id>' % (escape(result.class_name(c)), c)
+
+    out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    out.write('<structure type="editor_panel">\n<structure type="transition_graph">\n')
+    out.write('<structure mode="Default mode" type="fsa">\n')
+    out.write('<structure type="start_state"><state>%s</state></structure>\n' % state(result.initial))
+    out.write('<structure type="final_states">\n')
+    for c in range(result.n_classes):
+        if result.is_final(c):
+            out.write('<state>%s</state>\n' % state(c))
+    out.write('</structure>\n<structure type="state_set">\n')
+    for c in range(result.n_classes):
+        output = result.output(c)
+        out.write('<state>%s%s</state>\n' % (
+            state(c), '<label>%s</label>' % escape(str(output)) if output is not None else ''))
+    out.write('</structure>\n<structure type="transition_set">\n')
+    for c in range(result.n_classes):
+        for s in range(k):
+            for symbol in result.dfa.symbols_of(s):
+                out.write('<fsa_trans><input>%s</input><from>%s</from><to>%s</to></fsa_trans>\n' % (
+                    escape(symbol), state(c), state(result.next_state(c, s))))
+    out.write('</structure>\n<structure type="input_alph">\n')
+    for s in range(k):
+        for symbol in result.dfa.symbols_of(s):
+            out.write('<symbol>%s</symbol>\n' % escape(symbol))
+    out.write('</structure>\n</structure>\n</structure>\n</structure>\n')
+
+
+def write_jflap(result: MinimizedDFA, out, version: int = 6) -> None:
+    """Escribe el autómata mínimo como fichero JFLAP de la versión 6 u 8. Cada
+    clase se llama como su primer estado y, si tiene etiqueta de salida, la lleva
+    en <label>. Si el alfabeto está comprimido, cada clase de símbolos vuelve a
+    escribirse símbolo a símbolo."""
+    if version == 6:
+        _jflap_v6(result, out)
+    elif version == 8:
+        _jflap_v8(result, out)
+    else:
+        raise ValueError('Versión de JFLAP no soportada: %d' % version)
+
+
+def write_dot(result: MinimizedDFA, out) -> None:
+    """Escribe el autómata mínimo en formato Graphviz DOT. Las transiciones entre
+    el mismo par de clases se agrupan en una arista."""
+    k = result.n_symbols()
+    out.write('digraph minimized {\n    rankdir=LR;\n    __start [shape=point];\n')
+    for c in range(result.n_classes):
+        out.write('    %d [label=%s, shape=%s];\n' % (
+            c, json.dumps(result.class_name(c)), 'doublecircle' if result.is_final(c) else 'circle'))
+    out.write('    __start -> %d;\n' % result.initial)
+    for c in range(result.n_classes):
+        labels = {}
+        for s in range(k):
+            labels.setdefault(result.next_state(c, s), []).append(result.alphabet[s])
+        for target, symbols in labels.items():
+            out.write('    %d -> %d [label=%s];\n' % (c, target, json.dumps(','.join(symbols))))
+    out.write('}\n')
+
+
+def write_json(result: MinimizedDFA, out) -> None:
+    """Escribe el autómata mínimo en JSON, una clase por línea. Cada clase tiene
+    su nombre, si es final, los estados originales que agrupa y el destino de
+    cada símbolo (índice de clase, en el orden de "alphabet"). Si el alfabeto
+    está comprimido, "symbol_classes" da los símbolos de cada columna, y si hay
+    etiquetas de salida cada clase tiene la suya en "output"."""
+    k = result.n_symbols()
+    out.write('{"alphabet": %s, ' % json.dumps(list(result.alphabet)))
+    if result.dfa.symbol_classes is not None:
+        out.write('"symbol_classes": %s, ' % json.dumps(result.dfa.symbol_classes, ensure_ascii=False))
+    out.write('"initial": %d, "states": [\n' % result.initial)
+    for c in range(result.n_classes):
+        state = {
+            'name': result.class_name(c),
+            'final': result.is_final(c),
+            'members': [result.dfa.state_name(q) for q in result.members(c)],
+            'next': [result.next_state(c, s) for s in range(k)],
+        }
+        if result.outputs is not None:
+            state['output'] = result.output(c)
+        out.write(json.dumps(state, ensure_ascii=False))
+        out.write(',\n' if c + 1 < result.n_classes else '\n')
+    out.write(']}\n')
+
+
+def write_csv(result: MinimizedDFA, out) -> None:
+    """Escribe el autómata mínimo en CSV: una fila por clase con su nombre, si es
+    inicial y final, el nombre de la clase destino de cada símbolo y, al final,
+    los estados originales separados por espacios."""
+    k = result.n_symbols()
+    writer = csv.writer(out)
+    writer.writerow(['class', 'initial', 'final'] + list(result.alphabet) + ['members'])
+    for c in range(result.n_classes):
+        writer.writerow([result.class_name(c), int(result.is_initial(c)), int(result.is_final(c))]
+                        + [result.class_name(result.next_state(c, s)) for s in range(k)]
+                        + [' '.join(result.dfa.state_name(q) for q in result.members(c))])
+
+
+# Escritores disponibles por nombre, con la extensión de sus ficheros
+WRITERS = {
+    'table': (write_table, '.txt'),
+    'jflap6': (lambda result, out: write_jflap(result, out, 6), '.jff'),
+    'jflap8': (lambda result, out: write_jflap(result, out, 8), '.jff'),
+    'dot': (write_dot, '.dot'),
+    'json': (write_json, '.json'),
+    'csv': (write_csv, '.csv'),
+}
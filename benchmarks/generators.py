@@ -0,0 +1,164 @@
+"""Generadores de autómatas para las pruebas de rendimiento.
+
+Cada generador recibe el tamaño y una semilla y devuelve un CompiledDFA. Los
+autómatas parciales usan un estado de error explícito (el último) al que van
+las transiciones que faltan; write_jff() no lo escribe, de modo que al cargar
+el fichero se obtiene el autómata parcial.
+"""
+import random
+from array import array
+from xml.sax.saxutils import escape
+
+from automatons.auxiliar_classes.compiled_dfa import CompiledDFA, NO_SINK
+from automatons.auxiliar_classes.complete_afd import ERROR_STATE
+
+
+def _build(n: int, alphabet: list, table: list, final: list, initial: int = 0, partial: bool = False) -> CompiledDFA:
+    """Construye un CompiledDFA a partir de una tabla n×k en la que -1 indica
+    una transición ausente, que se redirige a un estado de error explícito."""
+    k = len(alphabet)
+    states = ['q%d' % q for q in range(n)]
+    sink = NO_SINK
+    if partial:
+        sink = n
+        states.append(ERROR_STATE)
+        table = [sink if t < 0 else t for t in table] + [sink] * k
+        final = list(final) + [0]
+    return CompiledDFA(states, list(alphabet), array('i', table), bytearray(final), initial, sink)
+
+
+def _alphabet(k: int) -> list:
+    """Alfabeto de k símbolos de un carácter: letras y, si no bastan, caracteres latinos extendidos"""
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    return [letters[c] if c < len(letters) else chr(0x100 + c) for c in range(k)]
+
+
+def random_dfa(n: int, seed: int = 0, k: int = 2, p_final: float = 0.5) -> CompiledDFA:
+    """Autómata completo con transiciones y estados finales uniformes"""
+    rng = random.Random(seed)
+    table = [rng.randrange(n) for _ in range(n * k)]
+    final = [rng.random() < p_final for _ in range(n)]
+    return _build(n, _alphabet(k), table, final)
+
+
+def chain(n: int, seed: int = 0, k: int = 1) -> CompiledDFA:
+    """Cadena q0 -> q1 -> ... -> q(n-1) con el último estado final. Es mínima y
+    tiene cadenas de distinguibilidad de longitud n."""
+    table = [min(q + 1, n - 1) if c == 0 else q for q in range(n) for c in range(k)]
+    final = [q == n - 1 for q in range(n)]
+    return _build(n, _alphabet(k), table, final)
+
+
+def mod_counter(n: int, seed: int = 0) -> CompiledDFA:
+    """Contador módulo n con los símbolos 'i' (incrementa) y 'r' (vuelve a 0).
+    Acepta cuando el contador vale 0."""
+    table = []
+    for q in range(n):
+        table.extend(((q + 1) % n, 0))
+    final = [q == 0 for q in range(n)]
+    return _build(n, ['i', 'r'], table, final)
+
+
+def binary_counter(n: int, seed: int = 0) -> CompiledDFA:
+    """Contador binario de m bits (2^m es la mayor potencia de 2 que no supera
+    n): el estado es el valor del contador y el símbolo j cambia el bit j y
+    propaga el acarreo a los bits altos, es decir, suma 2^j. Acepta cuando el
+    bit más alto vale 1. Es mínimo, con 2^m estados y m símbolos."""
+    m = max(1, n.bit_length() - 1)
+    size = 1 << m
+    table = []
+    for q in range(size):
+        table.extend((q + (1 << j)) % size for j in range(m))
+    final = [q >> (m - 1) & 1 for q in range(size)]
+    return _build(size, ['b%d' % j for j in range(m)], table, final)
+
+
+def hopcroft_worst(n: int, seed: int = 0) -> CompiledDFA:
+    """Familia de Berstel y Carton: un ciclo unario de longitud 2^m (la mayor
+    potencia de 2 que no supera n) cuyos estados finales siguen una secuencia de
+    De Bruijn. Obliga a Hopcroft a hacer Θ(n log n) trabajo."""
+    m = max(1, n.bit_length() - 1)
+    size = 1 << m
+    # Secuencia de De Bruijn B(2, m) por el algoritmo de las palabras de Lyndon
+    sequence = []
+    a = [0] * (m + 1)
+
+    def lyndon(t: int, p: int) -> None:
+        if t > m:
+            if m % p == 0:
+                sequence.extend(a[1:p + 1])
+        else:
+            a[t] = a[t - p]
+            lyndon(t + 1, p)
+            for j in range(a[t - p] + 1, 2):
+                a[t] = j
+                lyndon(t + 1, t)
+
+    lyndon(1, 1)
+    table = [(q + 1) % size for q in range(size)]
+    return _build(size, ['a'], table, sequence)
+
+
+def sparse_dfa(n: int, seed: int = 0, k: int = 16, out_degree: int = 3, p_final: float = 0.1) -> CompiledDFA:
+    """Autómata parcial: cada estado tiene out_degree transiciones sobre un
+    alfabeto de k símbolos y el resto van al estado de error"""
+    rng = random.Random(seed)
+    table = [-1] * (n * k)
+    for q in range(n):
+        for c in rng.sample(range(k), min(out_degree, k)):
+            table[q * k + c] = rng.randrange(n)
+    # Aseguramos que todos los estados sean accesibles encadenándolos
+    for q in range(n - 1):
+        table[q * k] = q + 1
+    final = [rng.random() < p_final for _ in range(n)]
+    final[n - 1] = True
+    return _build(n, _alphabet(k), table, final, partial=True)
+
+
+def large_alphabet(n: int, seed: int = 0, k: int = 256, groups: int = 4, p_final: float = 0.5) -> CompiledDFA:
+    """Autómata completo sobre k símbolos repartidos en unos pocos grupos que se
+    comportan igual en todos los estados, como las clases de caracteres de un
+    analizador léxico"""
+    rng = random.Random(seed)
+    group_of = [rng.randrange(groups) for _ in range(k)]
+    table = []
+    for q in range(n):
+        targets = [rng.randrange(n) for _ in range(groups)]
+        table.extend(targets[group_of[c]] for c in range(k))
+    final = [rng.random() < p_final for _ in range(n)]
+    return _build(n, _alphabet(k), table, final)
+
+
+GENERATORS = {
+    'random': random_dfa,
+    'chain': chain,
+    'counter': binary_counter,
+    'mod-counter': mod_counter,
+    'hopcroft-worst': hopcroft_worst,
+    'sparse': sparse_dfa,
+    'large-alphabet': large_alphabet,
+}
+
+
+def write_jff(dfa: CompiledDFA, path: str) -> None:
+    """Escribe un CompiledDFA como fichero JFLAP versión 6, omitiendo el estado
+    de error y las transiciones que llegan a él"""
+    k = dfa.n_symbols()
+    with open(path, 'w', encoding='utf-8') as out:
+        out.write('<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n')
+        out.write('<structure>\n<type>fa</type>\n<automaton>\n')
+        for q in range(dfa.n_states()):
+            if q == dfa.sink:
+                continue
+            out.write('<state id="%d" name="%s"><x>0</x><y>0</y>%s%s</state>\n' % (
+                q, dfa.state_name(q), '<initial/>' if dfa.is_initial(q) else '',
+                '<final/>' if dfa.is_final(q) else ''))
+        for q in range(dfa.n_states()):
+            if q == dfa.sink:
+                continue
+            for c in range(k):
+                target = dfa.next_state(q, c)
+                if target != dfa.sink:
+                    out.write('<transition><from>%d</from><to>%d</to><read>%s</read></transition>\n' % (
+                        q, target, escape(dfa.alphabet[c])))
+        out.write('</automaton>\n</structure>\n')
@@ -0,0 +1,228 @@
+"""Pruebas de rendimiento del proceso de minimización.
+
+Uso: python -m benchmarks.runner [-g GENERADOR ...] [-s TAMAÑO ...] [-a ALGORITMO ...] [-w PROCESOS ...] [-o RESULTADOS.json]
+
+Para cada generador, tamaño y algoritmo se genera un autómata, se escribe como
+.jff y se mide cada fase: carga (Afd), completado (CompleteAFD), compilación
+(CompiledDFA, o SparseDFA con valmari), refinamiento, numeración de clases (DSU), construcción del
+resultado y escritura. Cada caso se ejecuta en un proceso nuevo para medir su
+pico de memoria, salvo moore-parallel, que ya reparte el trabajo en su propio
+pool y se ejecuta en el proceso principal. Los resultados se guardan en JSON
+para compararlos entre versiones con --compare. Con -a moore-parallel cada caso
+se repite para cada número de procesos de -w, para medir cómo escala; el
+resultado guarda también los procesos usados de verdad ('effective_workers'),
+que son menos con autómatas pequeños (ver --min-states-per-worker).
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from jflap.Afd import Afd
+from automatons.auxiliar_classes.complete_afd import CompleteAFD
+from automatons.auxiliar_classes.compiled_dfa import CompiledDFA
+from automatons.auxiliar_classes.disjoint_set_union import StateDisjointSetUnion
+from automatons.auxiliar_classes.minimized_dfa import MinimizedDFA
+from automatons.auxiliar_classes.sparse_dfa import SparseDFA
+from automatons.hopcroft import hopcroft
+from automatons.minimize import number_classes, triangular_table
+from automatons.moore_numpy import moore_numpy
+from automatons.stats import MinimizationStats
+from automatons.valmari import valmari
+from automatons.writers import write_json
+from benchmarks.generators import GENERATORS, write_jff
+
+DEFAULT_SIZES = [10 ** e for e in range(2, 7)]
+# Como en automatons.moore_parallel, que necesita Python 3.8 y solo se importa
+# cuando se pide
+MIN_STATES_PER_WORKER = 50000
+# Por encima de este tamaño la tabla triangular (O(n²)) no se ejecuta
+DEFAULT_MAX_TABLE_STATES = 2000
+
+
+def _refine(dfa: CompiledDFA, algorithm: str, workers: int = None, stats: MinimizationStats = None,
+            min_states_per_worker: int = MIN_STATES_PER_WORKER) -> tuple:
+    """Ejecuta el algoritmo y devuelve su partición y el tiempo de la fase DSU"""
+    if algorithm == 'table':
+        table = triangular_table(dfa)
+        start = time.perf_counter()
+        n = dfa.n_states()
+        dsu = StateDisjointSetUnion(n)
+        for q_a in range(n):
+            for q_b in range(q_a):
+                if not table.is_marked(q_a, q_b):
+                    dsu.join(q_a, q_b)
+        return dsu.partition(), time.perf_counter() - start
+    if algorithm == 'hopcroft':
+        return hopcroft(dfa), 0.0
+    if algorithm == 'moore-numpy':
+        return moore_numpy(dfa), 0.0
+    if algorithm == 'moore-parallel':
+        # Necesita Python 3.8 o posterior; solo se importa cuando se pide
+        from automatons.moore_parallel import moore_parallel
+        return moore_parallel(dfa, workers, stats, min_states_per_worker), 0.0
+    if algorithm == 'valmari':
+        return valmari(dfa), 0.0
+    raise ValueError('Algoritmo desconocido: ' + algorithm)
+
+
+def run_case(generator: str, size: int, algorithm: str, seed: int, directory: str, workers: int = None,
+             min_states_per_worker: int = MIN_STATES_PER_WORKER) -> dict:
+    """Ejecuta un caso completo y devuelve sus tiempos por fase en segundos"""
+    phases = {}
+    start = time.perf_counter()
+    source = GENERATORS[generator](size, seed)
+    phases['generate'] = time.perf_counter() - start
+    path = os.path.join(directory, '%s-%d-%d.jff' % (generator, size, seed))
+    start = time.perf_counter()
+    write_jff(source, path)
+    phases['write_jff'] = time.perf_counter() - start
+    start = time.perf_counter()
+    automaton = Afd(path)
+    phases['load'] = time.perf_counter() - start
+    os.remove(path)
+    start = time.perf_counter()
+    complete_automaton = CompleteAFD(automaton)
+    phases['complete'] = time.perf_counter() - start
+    start = time.perf_counter()
+    if algorithm == 'valmari':
+        dfa = SparseDFA.from_complete_afd(complete_automaton)
+    else:
+        dfa = CompiledDFA.from_complete_afd(complete_automaton)
+    phases['compile'] = time.perf_counter() - start
+    # Solo para saber cuántos procesos ha usado de verdad moore-parallel
+    stats = MinimizationStats()
+    start = time.perf_counter()
+    labels, dsu_time = _refine(dfa, algorithm, workers, stats, min_states_per_worker)
+    phases['refine'] = time.perf_counter() - start - dsu_time
+    start = time.perf_counter()
+    class_of, n_classes = number_classes(labels)
+    phases['dsu'] = dsu_time + time.perf_counter() - start
+    start = time.perf_counter()
+    result = MinimizedDFA(dfa, class_of, n_classes)
+    with open(os.devnull, 'w') as out:
+        write_json(result, out)
+    phases['output'] = time.perf_counter() - start
+    return {
+        'generator': generator,
+        'size': size,
+        'algorithm': algorithm,
+        'workers': workers,
+        'effective_workers': stats.counters.get('workers'),
+        'seed': seed,
+        'states': dfa.n_states(),
+        'classes': n_classes,
+        'phases': phases,
+        'total': sum(phases.values()),
+        # En Linux ru_maxrss está en KiB. Con moore-parallel el caso se ejecuta
+        # en el proceso principal y su pico incluye el de los casos anteriores
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def _revision() -> str:
+    """Commit actual del repositorio, si se puede obtener"""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old: dict, new: dict, threshold: float) -> list:
+    """Devuelve las fases que en new tardan más de threshold veces lo que en old"""
+    previous = {(r['generator'], r['size'], r['algorithm'], r.get('workers')): r for r in old['results']}
+    regressions = []
+    for r in new['results']:
+        before = previous.get((r['generator'], r['size'], r['algorithm'], r.get('workers')))
+        if before is None:
+            continue
+        for phase, seconds in r['phases'].items():
+            old_seconds = before['phases'].get(phase)
+            # Ignoramos las fases demasiado cortas para medirse con fiabilidad
+            if old_seconds and old_seconds > 1e-3 and seconds > threshold * old_seconds:
+                regressions.append((r['generator'], r['size'], r['algorithm'], phase, old_seconds, seconds))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.runner',
+                                     description='Mide cada fase de la minimización.')
+    parser.add_argument('-g', '--generators', nargs='+', choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    parser.add_argument('-s', '--sizes', nargs='+', type=int, default=DEFAULT_SIZES)
+    parser.add_argument('-a', '--algorithms', nargs='+', choices=('table', 'hopcroft', 'moore-numpy', 'moore-parallel', 'valmari'),
+                        default=['hopcroft'])
+    parser.add_argument('-w', '--workers', nargs='+', type=int, default=[os.cpu_count()],
+                        help='números de procesos con los que medir moore-parallel')
+    parser.add_argument('--min-states-per-worker', type=int, default=MIN_STATES_PER_WORKER,
+                        help='estados mínimos por proceso de moore-parallel (por defecto, %(default)s)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-table-states', type=int, default=DEFAULT_MAX_TABLE_STATES)
+    parser.add_argument('-o', '--output', help='fichero JSON de resultados')
+    parser.add_argument('--compare', metavar='ANTERIOR.json',
+                        help='compara con unos resultados anteriores e informa de las regresiones')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='factor a partir del cual una fase se considera más lenta')
+    args = parser.parse_args(argv)
+
+    # moore-parallel se mide una vez por cada número de procesos
+    cases = []
+    for algorithm in args.algorithms:
+        if algorithm == 'moore-parallel':
+            cases.extend((algorithm, workers) for workers in args.workers)
+        else:
+            cases.append((algorithm, None))
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for generator in args.generators:
+            for size in args.sizes:
+                for algorithm, workers in cases:
+                    if algorithm == 'table' and size > args.max_table_states:
+                        continue
+                    name = algorithm if workers is None else '%s/%d' % (algorithm, workers)
+                    try:
+                        if algorithm == 'moore-parallel':
+                            # moore-parallel crea su propio pool de procesos, que no
+                            # anidamos dentro de otro: se ejecuta en este proceso
+                            result = run_case(generator, size, algorithm, args.seed, directory, workers,
+                                              args.min_states_per_worker)
+                        else:
+                            # Un proceso nuevo por caso, para que el pico de memoria sea solo suyo
+                            with ProcessPoolExecutor(max_workers=1) as pool:
+                                result = pool.submit(run_case, generator, size, algorithm, args.seed,
+                                                     directory, workers).result()
+                    except Exception as error:
+                        print('%s n=%d %s: ERROR %s' % (generator, size, name, error), file=sys.stderr)
+                        continue
+                    results.append(result)
+                    if workers is not None and result['effective_workers'] != workers:
+                        name += ' (%d)' % result['effective_workers']
+                    print('%-15s n=%-8d %-22s %8.3f s  %8d KiB  %s' % (
+                        generator, size, name, result['total'], result['peak_rss_kb'],
+                        ' '.join('%s=%.3f' % item for item in result['phases'].items())), flush=True)
+    report = {
+        'revision': _revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        for generator, size, algorithm, phase, before, after in regressions:
+            print('REGRESIÓN %s n=%d %s %s: %.3f s -> %.3f s' % (generator, size, algorithm, phase, before, after))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,8 +6,13 @@ Created on 11 may. 2018
 
 import xml.etree.ElementTree as ET
 import re
+import time
 
 from jflap.Transiciones import Transiciones
+from jflap.Validacion import ErrorValidacion, ExcepcionValidacion
+
+#Patron de los nombres no permitidos, compilado una sola vez
+PATRON_NUMERICO = re.compile(r'\d+')
 
 class Afd(object):
     '''
@@ -16,8 +21,6 @@ class Afd(object):
     
     Atributos privados
     ------------------
-    root : ElementTree
-        Raíz del arbol XML del fichero JFLAP
     automata : dict
         Transiciones del automata representadas en un diccionario
     nombreEstados : dict
@@ -30,15 +33,26 @@ class Afd(object):
         Nombre del estado inicial
     estadosFinales : set
         Conjunto de identificadores de estados finales
+    etiquetas : dict
+        La clave es el nombre del estado y el valor el texto de su elemento <label>,
+        solo para los estados que lo tienen (por ejemplo, el token de un analizador lexico)
     alfabeto : set
         Conjunto de caracteres que forman el alfabeto del automata
+    errores : list
+        Errores de validacion (ErrorValidacion) encontrados durante la carga
+    tiempos : dict
+        Segundos empleados en cada fase de la carga: 'lectura', 'validacion' y 'total'
         
     Metodos publicos
     ----------------
     estadoSiguiente(estado, simbolo) : str
         Devuelve el estado al que se llega desde otro, con cierto simbolo. Usa nombres de estados
+    transicionesDesde(estado) : dict
+        Devuelve las transiciones de salida de un estado. Usa nombres de estados
     esFinal(estado) : bool
         Comprueba si un estado es final
+    getEtiqueta(estado) : str
+        Devuelve la etiqueta de un estado, o None si no tiene
     esSimbolo(simbolo) : bool
         Comprueba si un simbolo esta en el alfabeto del automata
     getEstadoInicial() : str
@@ -50,9 +64,9 @@ class Afd(object):
         
     Metodos privados
     ----------------
-    analizadorV6() : int
+    analizadorV6(eventos, raiz) : int
         Analiza un fichero JFLAP version 6 (editor version 7). Devuelve 1 si ok, 0 si error
-    analizadorV8() : int
+    analizadorV8(eventos, raiz) : int
         Analiza un fichero JFLAP version 8 (editor version 8beta). Devuelve 1 si ok, 0 si error
     traductorEstados (estado): str
         Devuelve el nombre del estado, dado su identificador
@@ -60,11 +74,16 @@ class Afd(object):
         Devuelve el identificador del estado, dado su nombre
     addNombreEstado(estado, nombre)
         Inserta un estado en el diccionario nombreEstados
+    addTransicion(desdeEstado, conSimbolo, aEstado) : int
+        Inserta una transicion leida del fichero. Devuelve 1 si ok, 0 si no es determinista
+        (y anota el error en errores)
+    validar()
+        Comprueba la coherencia del automata una vez leido
     mostrarTransiciones(identificador)
         Imprime por salida estandar las transiciones de un estado en forma de diccionario
     '''
 
-    def __init__(self, ruta, version=6):
+    def __init__(self, ruta, version=None):
         '''
         Inicializador del automata
         
@@ -73,14 +92,18 @@ class Afd(object):
         ruta : str
             Localizacion del fichero JFLAP
         version : int
-            Version del fichero. Puede ser 6 y 8
+            Version del fichero. Puede ser 6 y 8. Si no se indica se detecta a partir
+            de la raiz del documento
             
         Excepciones
         -----------
-            Lanza Exception si la version no es correcta o falla el analisis
+            Lanza Exception si la version no es correcta o falla el analisis, y
+            ExcepcionValidacion con todos los errores si el automata no es valido
         '''
         
-        self.root = ET.parse(ruta).getroot()
+        inicio = time.perf_counter()
+        if version not in (None, 6, 8):
+            raise Exception('Esa version no esta soportada por el Lector')
         self.automata = dict()
         self.nombreEstados = dict()
         self.idEstados = dict()
@@ -88,105 +111,152 @@ class Afd(object):
         self.ntransiciones = 0
         self.estadoInicial = None
         self.estadosFinales = set()
+        self.etiquetas = dict()
         self.alfabeto = set()
-        if version == 6:
-            if self.analizadorV6() == 0:
+        self.errores = []
+        self.tiempos = dict()
+        #Leemos el fichero en streaming: cada elemento se procesa y se descarta al cerrarse
+        eventos = ET.iterparse(ruta, events=('start', 'end'))
+        _, raiz = next(eventos)
+        #Los ficheros de la version 8 tienen una raiz <structure type="...">
+        detectada = 8 if 'type' in raiz.attrib else 6
+        if version is not None and version != detectada:
+            raise Exception('El fichero no corresponde a la version %d' % version)
+        if detectada == 6:
+            if self.analizadorV6(eventos, raiz) == 0:
                 raise Exception('El analisis version 6 no ha podido continuar')
-        elif version == 8:
-            if self.analizadorV8() == 0:
-                raise Exception('El analisis version 8 no ha podido continuar')
         else:
-            raise Exception('Esa version no esta soportada por el Lector')
+            if self.analizadorV8(eventos, raiz) == 0:
+                raise Exception('El analisis version 8 no ha podido continuar')
+        lectura = time.perf_counter()
+        self.validar()
+        fin = time.perf_counter()
+        self.tiempos['lectura'] = lectura - inicio
+        self.tiempos['validacion'] = fin - lectura
+        self.tiempos['total'] = fin - inicio
+        if self.errores:
+            raise ExcepcionValidacion(self.errores)
         
-    def analizadorV6 (self):
+    def analizadorV6 (self, eventos, raiz):
         '''
-        Funcion que analiza un fichero JFLAP correspondiente a la version 8
+        Funcion que analiza un fichero JFLAP correspondiente a la version 6
         Devuelve un 0 si el analisis falla, o un 1 si se analiza bien
+        
+        Parametros
+        ----------
+        eventos: iterator
+            Eventos ('start', 'end') de ET.iterparse, ya consumida la raiz
+        raiz: Element
+            Raiz del documento
         '''
         
-        #Para cada estado
-        for nodo in self.root.iter('state'):
-            #Buscamos un estado por su 'id'
-            estado = nodo.attrib['id']
-            #Para este estado inicializamos su tabla de transiciones
-            self.automata[estado] = Transiciones()
-            #Incluimos el nombre del estado al diccionario de nombres
-            self.addNombreEstado(estado, nodo.attrib['name'])
-            self.idEstados[nodo.attrib['name']] = estado
-            #Incrementamos el numero de estados de nuestro Automata
-            self.nestados += 1
-            #Comprobamos si es un estado inicial o final
-            if nodo.find('initial') != None:
-                self.estadoInicial = estado
-            if nodo.find('final') != None:
-                self.estadosFinales.add(self.traductorEstados(estado))
-        #Para cada transicion
-        for nodo in self.root.iter('transition'):
-            #Buscamos la informarcion desde el estado que parte
-            desdeEstado = nodo.find('./from').text
-            #Al estado que va
-            aEstado = nodo.find('./to').text
-            #Con que simbolo realiza la transicion
-            conSimbolo = nodo.find('./read').text
-            aux = self.automata[desdeEstado]
-            #Comprobamos si la transicion se realiza con lambda
-            if conSimbolo == None:
-                print('El automata que desea analizar no es determinista (AFND)')
-                #devolvemos el valor de 0 dado que no podemos analizar AFND
-                return 0
-            #Insertamos una transicion en nuestro objeto
-            aux.addTransicion(conSimbolo, aEstado)
-            self.alfabeto.add(conSimbolo)
-            #Incrementamos el numero de transiciones
-            self.ntransiciones += 1
+        #Pila con los elementos abiertos, para poder soltar cada uno al cerrarlo
+        abiertos = [raiz]
+        for evento, nodo in eventos:
+            if evento == 'start':
+                abiertos.append(nodo)
+                continue
+            abiertos.pop()
+            if nodo.tag == 'state':
+                #Buscamos un estado por su 'id'
+                estado = nodo.attrib['id']
+                nombre = nodo.attrib['name']
+                #Para este estado inicializamos su tabla de transiciones
+                self.automata.setdefault(estado, Transiciones())
+                #Incluimos el nombre del estado al diccionario de nombres
+                self.addNombreEstado(estado, nombre)
+                #Incrementamos el numero de estados de nuestro Automata
+                self.nestados += 1
+                #Comprobamos si es un estado inicial o final
+                for hijo in nodo:
+                    if hijo.tag == 'initial':
+                        self.estadoInicial = estado
+                    elif hijo.tag == 'final':
+                        self.estadosFinales.add(nombre)
+                    elif hijo.tag == 'label' and hijo.text:
+                        self.etiquetas[nombre] = hijo.text
+            elif nodo.tag == 'transition':
+                #Buscamos el estado del que parte, al que va y el simbolo que lee
+                campos = {hijo.tag: hijo.text for hijo in nodo}
+                desdeEstado = campos['from']
+                aEstado = campos['to']
+                conSimbolo = campos.get('read')
+                #Insertamos una transicion en nuestro objeto; si no es determinista
+                #se anota el error y se sigue leyendo para informar de todos
+                self.addTransicion(desdeEstado, conSimbolo, aEstado)
+                #Las transiciones lambda no tienen simbolo
+                if conSimbolo != None:
+                    self.alfabeto.add(conSimbolo)
+            else:
+                continue
+            #Soltamos el elemento ya procesado para no guardar el arbol
+            abiertos[-1].remove(nodo)
         #Devolvemos el valor de que la funcion ha conseguido crear el automata satisfactoriamente
         return 1
     
-    def analizadorV8 (self):
+    def analizadorV8 (self, eventos, raiz):
         '''
         Funcion que analiza un fichero JFLAP correspondiente a la version 8
         Devuelve un 0 si el analisis falla, o un 1 si se analiza bien
+        
+        Parametros
+        ----------
+        eventos: iterator
+            Eventos ('start', 'end') de ET.iterparse, ya consumida la raiz
+        raiz: Element
+            Raiz del documento
         '''
     
-        #Primero extraer los estados
-        nodo = self.root.find(".//structure[@type='state_set']")
-        for hijo in nodo.iter('state'):
-            estado = hijo.find('id').text
-            nombre = hijo.find('name').text
-            self.idEstados[nombre] = estado
-            #Para este estado inicializamos su tabla de transiciones
-            self.automata[estado] = Transiciones()
-            #Incluimos el nombre del estado al diccionario de nombres
-            self.addNombreEstado(estado, nombre)
-            #Incrementamos el numero de estados de nuestro Automata
-            self.nestados += 1
-        #Para cada estado
-        for nodo in self.root.iter('structure'):
-            tipo = nodo.attrib['type']
-            #Insertar estados finales
-            if tipo == "final_states":
-                self.estadosFinales.add(nodo.find('.//name').text)
+        #Pila con los elementos abiertos y pila con los tipos de <structure> abiertos
+        abiertos = [raiz]
+        tipos = [raiz.attrib['type']]
+        for evento, nodo in eventos:
+            if evento == 'start':
+                abiertos.append(nodo)
+                if nodo.tag == 'structure':
+                    tipos.append(nodo.attrib.get('type'))
+                continue
+            abiertos.pop()
+            if nodo.tag == 'structure':
+                tipos.pop()
+                continue
+            tipo = tipos[-1] if tipos else None
+            #Los estados aparecen dentro de varias estructuras: la de estados, la de
+            #estados finales y la del estado inicial
+            if nodo.tag == 'state' and tipo is not None:
+                campos = {hijo.tag: hijo.text for hijo in nodo}
+                estado = campos['id']
+                nombre = campos['name']
+                if tipo == 'state_set':
+                    #Para este estado inicializamos su tabla de transiciones
+                    self.automata.setdefault(estado, Transiciones())
+                    #Incluimos el nombre del estado al diccionario de nombres
+                    self.addNombreEstado(estado, nombre)
+                    #Incrementamos el numero de estados de nuestro Automata
+                    self.nestados += 1
+                    if campos.get('label'):
+                        self.etiquetas[nombre] = campos['label']
+                #Insertar estados finales
+                elif tipo == 'final_states':
+                    self.estadosFinales.add(nombre)
+                #Detectar estado inicial
+                elif tipo == 'start_state':
+                    self.estadoInicial = estado
             #Insertar transiciones
-            elif tipo == "transition_set":
-                for hijo in nodo.iter('fsa_trans'):
-                    desdeEstado = hijo.find('./from/id').text
-                    aEstado = hijo.find('./to/id').text
-                    conSimbolo = hijo.find('./input').text
-                    if conSimbolo == None:
-                        print('El automata que desea analizar no es determinista (AFND)')
-                        #devolvemos el valor de 0 dado que no podemos analizar AFND
-                        return 0
-                    aux = self.automata[desdeEstado]
-                    aux.addTransicion(conSimbolo, aEstado)
-                    self.ntransiciones += 1
+            elif nodo.tag == 'fsa_trans':
+                campos = {hijo.tag: hijo for hijo in nodo}
+                desdeEstado = campos['from'].find('id').text
+                aEstado = campos['to'].find('id').text
+                conSimbolo = campos['input'].text if 'input' in campos else None
+                #Si no es determinista se anota el error y se sigue leyendo
+                self.addTransicion(desdeEstado, conSimbolo, aEstado)
             #Extraer el alfabeto del automata
-            elif tipo == "input_alph":
-                for hijo in nodo.iter('symbol'):
-                    simbolo = hijo.text
-                    self.alfabeto.add(simbolo)
-            #Detectar estado inicial
-            elif tipo == "start_state":
-                self.estadoInicial = nodo.find('*/id').text
+            elif nodo.tag == 'symbol' and tipo == 'input_alph':
+                self.alfabeto.add(nodo.text)
+            else:
+                continue
+            #Soltamos el elemento ya procesado para no guardar el arbol
+            abiertos[-1].remove(nodo)
         #Devolver el codigo de que la funcion ha realizado el analisis correctamente
         return 1
 
@@ -242,9 +312,24 @@ class Afd(object):
         except:
             return None
         
+    def transicionesDesde (self, estado):
+        '''
+        Devuelve un diccionario con las transiciones que salen de un estado (nombre), donde la
+        clave es el simbolo y el valor el nombre del estado al que se llega
+        
+        Parametros
+        ----------
+        estado: str
+            Nombre del estado
+        '''
+        
+        trans = self.automata[self.idEstados[estado]].transiciones
+        return {s: self.nombreEstados[trans[s]] for s in trans}
+        
     def addNombreEstado (self, estado, nombre):
         '''
-        Inserta en el diccionario un nombre de estado si no esta repetido
+        Inserta en los diccionarios de nombres un estado si su nombre no esta repetido
+        ni esta formado por digitos. Si lo esta, anota el error en self.errores
         
         Parametros
         ----------
@@ -254,10 +339,65 @@ class Afd(object):
             Nombre del estado
         '''
         
-        if nombre in self.nombreEstados.values() or re.match('\d+', nombre):
-            raise Exception('El nombre del estado esta duplicado o esta formado solo por digitos: ', estado, ' -> ', nombre)
+        #idEstados es el indice inverso de nombreEstados: comprobar duplicados es O(1)
+        if nombre in self.idEstados:
+            self.errores.append(ErrorValidacion('nombre_duplicado', estado,
+                'El nombre %s ya lo usa el estado %s' % (nombre, self.idEstados[nombre])))
+        elif PATRON_NUMERICO.match(nombre):
+            self.errores.append(ErrorValidacion('nombre_numerico', estado,
+                'El nombre %s esta formado solo por digitos' % nombre))
         else:
             self.nombreEstados[estado] = nombre
+            self.idEstados[nombre] = estado
+            
+    def addTransicion (self, desdeEstado, conSimbolo, aEstado):
+        '''
+        Inserta una transicion leida del fichero. Si es lambda o ya hay otra con el mismo
+        simbolo hacia otro estado, el automata no es determinista: anota el error en
+        self.errores y devuelve 0; si no, devuelve 1
+        
+        Parametros
+        ----------
+        desdeEstado: str
+            Identificador del estado del que parte la transicion
+        conSimbolo: str
+            Simbolo que etiqueta la transicion, o None si es lambda
+        aEstado: str
+            Identificador del estado al que llega la transicion
+        '''
+        
+        trans = self.automata.setdefault(desdeEstado, Transiciones())
+        if conSimbolo == None:
+            self.errores.append(ErrorValidacion('no_determinista', desdeEstado,
+                'Hay una transicion lambda hacia %s' % aEstado))
+            return 0
+        if trans.transiciones.get(conSimbolo, aEstado) != aEstado:
+            self.errores.append(ErrorValidacion('no_determinista', desdeEstado,
+                'Hay transiciones con %s hacia %s y hacia %s' % (conSimbolo, trans.transiciones[conSimbolo], aEstado)))
+            return 0
+        trans.addTransicion(conSimbolo, aEstado)
+        #Incrementamos el numero de transiciones
+        self.ntransiciones += 1
+        return 1
+            
+    def validar (self):
+        '''
+        Comprueba, en una sola pasada, que hay estado inicial y que todas las transiciones
+        salen y llegan a estados declarados. Los errores se anotan en self.errores
+        '''
+        
+        if self.estadoInicial not in self.nombreEstados:
+            self.errores.append(ErrorValidacion('sin_estado_inicial', self.estadoInicial,
+                'El automata no tiene un estado inicial valido'))
+        for estado in self.automata:
+            trans = self.automata[estado].transiciones
+            if trans and estado not in self.nombreEstados:
+                self.errores.append(ErrorValidacion('estado_desconocido', estado,
+                    'Hay transiciones desde un estado no declarado'))
+            for simbolo in trans:
+                if trans[simbolo] not in self.nombreEstados:
+                    self.errores.append(ErrorValidacion('estado_desconocido', trans[simbolo],
+                        'La transicion desde %s con %s llega a un estado no declarado' % (estado, simbolo)))
             
     def esFinal(self, estado):
         '''
@@ -271,6 +411,18 @@ class Afd(object):
         
         return estado in self.estadosFinales 
     
+    def getEtiqueta(self, estado):
+        '''
+        Devuelve el texto del elemento <label> del estado, o None si no tiene
+        
+        Parametros
+        ----------
+        estado: str
+            Nombre del estado
+        '''
+        
+        return self.etiquetas.get(estado)
+    
     def esSimbolo(self, simbolo):
         '''
         Devuelve True si el simbolo esta en el alfabeto
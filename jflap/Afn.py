@@ -0,0 +1,131 @@
+'''
+Lector de automatas finitos no deterministas de JFLAP
+'''
+
+from jflap.Afd import Afd
+from jflap.Validacion import ErrorValidacion
+
+class Afn(Afd):
+    '''
+    Clase Afn que interpreta un fichero JFLAP con un automata finito no determinista,
+    con o sin transiciones lambda. Usa el mismo analisis que Afd, pero un estado puede
+    tener varias transiciones con el mismo simbolo y transiciones lambda
+    
+    Atributos privados
+    ------------------
+    transicionesAfn : dict
+        La clave es el identificador del estado y el valor un diccionario que asocia a
+        cada simbolo (None para lambda) la lista de identificadores de los estados destino
+        
+    Metodos publicos
+    ----------------
+    sucesoresDesde(estado) : dict
+        Devuelve las transiciones de salida de un estado, con la lista de destinos de
+        cada simbolo (None para lambda). Usa nombres de estados
+    getEstados() : list
+        Devuelve los nombres de todos los estados
+    esDeterminista() : bool
+        Comprueba si el automata no tiene transiciones lambda ni varios destinos por simbolo
+    '''
+
+    def __init__(self, ruta, version=None):
+        '''
+        Inicializador del automata, con los mismos parametros y excepciones que Afd
+        
+        Parametros
+        ----------
+        ruta : str
+            Localizacion del fichero JFLAP
+        version : int
+            Version del fichero. Puede ser 6 y 8. Si no se indica se detecta a partir
+            de la raiz del documento
+        '''
+        
+        self.transicionesAfn = dict()
+        super().__init__(ruta, version)
+        
+    def addTransicion (self, desdeEstado, conSimbolo, aEstado):
+        '''
+        Inserta una transicion leida del fichero, aunque sea lambda o haya otra con el
+        mismo simbolo. Devuelve siempre 1
+        
+        Parametros
+        ----------
+        desdeEstado: str
+            Identificador del estado del que parte la transicion
+        conSimbolo: str
+            Simbolo que etiqueta la transicion, o None si es lambda
+        aEstado: str
+            Identificador del estado al que llega la transicion
+        '''
+        
+        destinos = self.transicionesAfn.setdefault(desdeEstado, dict()).setdefault(conSimbolo, [])
+        if aEstado not in destinos:
+            destinos.append(aEstado)
+            self.ntransiciones += 1
+        return 1
+        
+    def validar (self):
+        '''
+        Comprueba que hay estado inicial y que todas las transiciones salen y llegan a
+        estados declarados. Los errores se anotan en self.errores
+        '''
+        
+        super().validar()
+        for estado in self.transicionesAfn:
+            if estado not in self.nombreEstados:
+                self.errores.append(ErrorValidacion('estado_desconocido', estado,
+                    'Hay transiciones desde un estado no declarado'))
+            for simbolo, destinos in self.transicionesAfn[estado].items():
+                for destino in destinos:
+                    if destino not in self.nombreEstados:
+                        self.errores.append(ErrorValidacion('estado_desconocido', destino,
+                            'La transicion desde %s con %s llega a un estado no declarado' % (estado, simbolo)))
+        
+    def sucesoresDesde (self, estado):
+        '''
+        Devuelve un diccionario con las transiciones que salen de un estado (nombre), donde la
+        clave es el simbolo (None para lambda) y el valor la lista de nombres de los estados
+        a los que se llega
+        
+        Parametros
+        ----------
+        estado: str
+            Nombre del estado
+        '''
+        
+        trans = self.transicionesAfn.get(self.idEstados[estado], dict())
+        return {s: [self.nombreEstados[d] for d in trans[s]] for s in trans}
+        
+    def transicionesDesde (self, estado):
+        '''
+        Un automata no determinista no tiene un unico destino por simbolo: hay que usar
+        sucesoresDesde o determinizarlo antes
+        '''
+        
+        raise Exception('El automata no es determinista: use sucesoresDesde')
+        
+    def estadoSiguiente (self, estado, simbolo):
+        '''
+        Igual que transicionesDesde, no tiene sentido en un automata no determinista
+        '''
+        
+        raise Exception('El automata no es determinista: use sucesoresDesde')
+        
+    def getEstados (self):
+        '''
+        Devuelve los nombres de todos los estados
+        '''
+        
+        return list(self.idEstados)
+        
+    def esDeterminista (self):
+        '''
+        Devuelve True si no hay transiciones lambda ni varios destinos con el mismo simbolo
+        '''
+        
+        for trans in self.transicionesAfn.values():
+            for simbolo, destinos in trans.items():
+                if simbolo == None or len(destinos) > 1:
+                    return False
+        return True
@@ -0,0 +1,54 @@
+'''
+Errores de validacion del lector de ficheros JFLAP
+'''
+
+class ErrorValidacion(object):
+    '''
+    Clase que describe un error encontrado al validar un automata
+    
+    Atributos
+    ---------
+    motivo : str
+        Tipo de error: 'nombre_duplicado', 'nombre_numerico', 'estado_desconocido',
+        'sin_estado_inicial' o 'no_determinista'
+    estado : str
+        Identificador del estado afectado, o None
+    detalle : str
+        Descripcion legible del error
+    '''
+
+    def __init__(self, motivo, estado, detalle):
+        '''
+        Constructor
+        '''
+        self.motivo = motivo
+        self.estado = estado
+        self.detalle = detalle
+        
+    def __str__(self):
+        return '%s (%s): %s' % (self.motivo, self.estado, self.detalle)
+
+
+class ExcepcionValidacion(Exception):
+    '''
+    Excepcion que agrupa todos los errores encontrados al validar un automata
+    
+    Atributos
+    ---------
+    errores : list
+        Lista de ErrorValidacion
+    '''
+
+    def __init__(self, errores):
+        '''
+        Constructor
+        '''
+        super().__init__('Se han encontrado %d errores: %s' % (len(errores), '; '.join(str(e) for e in errores)))
+        self.errores = errores
+        
+    def __reduce__(self):
+        '''
+        Permite pasar la excepcion entre procesos: se reconstruye a partir de la
+        lista de errores y no del mensaje
+        '''
+        return (ExcepcionValidacion, (self.errores,))
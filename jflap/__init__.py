@@ -1 +1 @@
-__all__ = ['Afd']
\ No newline at end of file
+__all__ = ['Afd', 'Afn']
\ No newline at end of file
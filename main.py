@@ -1,6 +1,10 @@
 from jflap.Afd import Afd
-from sys import stderr
-from automatons.minimize import minimize
+from sys import stderr, stdout
+from automatons.auxiliar_classes.complete_afd import CompleteAFD
+from automatons.auxiliar_classes.compiled_dfa import CompiledDFA
+from automatons.binary_format import BINARY_EXTENSION, load_binary
+from automatons.minimize import minimize_compiled
+from automatons.writers import write_table
 
 if __name__ == '__main__':
     leer = True
@@ -11,10 +15,14 @@ if __name__ == '__main__':
             print('No se debe introducir una ruta vacía.')
             exit()
         try:
-            automaton = Afd(path)
+            # Los autómatas binarios ya están compilados y no hay que analizarlos
+            if path.endswith(BINARY_EXTENSION):
+                dfa = load_binary(path)
+            else:
+                dfa = CompiledDFA.from_complete_afd(CompleteAFD(Afd(path)))
         except FileNotFoundError:
             print('Me temo que la ruta está mal.', file=stderr)
             leer = True
         except Exception as error:
             print('Problema analizando el fichero: ', error, file=stderr)
-    minimize(automaton)
+    write_table(minimize_compiled(dfa), stdout)
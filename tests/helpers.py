@@ -0,0 +1,34 @@
+import random
+from array import array
+
+from automatons.auxiliar_classes.compiled_dfa import CompiledDFA, NO_SINK
+
+
+def random_dfa(rng: random.Random, min_states: int = 1, max_states: int = 10, min_symbols: int = 1,
+               max_symbols: int = 3, final: float = 0.3, sink: float = 0.5, to_sink: float = 0.0,
+               outputs: float = 0.0, random_initial: bool = False) -> CompiledDFA:
+    """Autómata completo pequeño para las pruebas aleatorias. Cada estado es
+    final con probabilidad final. Con probabilidad sink el último estado es un
+    estado de error explícito, al que se redirige cada transición con
+    probabilidad to_sink. Con probabilidad outputs los estados tienen etiquetas
+    de salida. El inicial es q0 salvo con random_initial."""
+    n = rng.randint(min_states, max_states)
+    k = rng.randint(min_symbols, max_symbols)
+    transitions = array('i', [rng.randrange(n) for _ in range(n * k)])
+    finals = bytearray(rng.random() < final for _ in range(n))
+    labels = None
+    if rng.random() < outputs:
+        labels = [rng.choice([None, None, 'A', 'B']) for _ in range(n)]
+    error = NO_SINK
+    if n > 1 and rng.random() < sink:
+        error = n - 1
+        for i in range(len(transitions)):
+            if rng.random() < to_sink:
+                transitions[i] = error
+        transitions[error * k:] = array('i', [error] * k)
+        finals[error] = 0
+        if labels is not None:
+            labels[error] = None
+    initial = rng.randrange(n) if random_initial else 0
+    return CompiledDFA(['q%d' % q for q in range(n)], [chr(ord('a') + c) for c in range(k)],
+                       transitions, finals, initial, error, None, labels)
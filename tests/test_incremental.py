@@ -0,0 +1,82 @@
+import random
+import unittest
+from array import array
+
+from automatons.auxiliar_classes.compiled_dfa import CompiledDFA
+from automatons.hopcroft import hopcroft
+from automatons.incremental import IncrementalMinimizer
+from automatons.minimize import number_classes
+from tests.helpers import random_dfa
+
+
+class IncrementalMinimizerTest(unittest.TestCase):
+
+    def assertPartition(self, minimizer: IncrementalMinimizer) -> None:
+        """La partición mantenida es la que calcula hopcroft() sobre la tabla actual"""
+        expected = hopcroft(minimizer._compiled())
+        self.assertEqual(number_classes(list(minimizer.class_of)), number_classes(expected))
+
+    def test_cycle_matches_existing_cycle(self):
+        # q0 y q1 se alternan con a y q0 es final; al cerrar el ciclo q2 -> q3 -> q2,
+        # q2 equivale a q0 y q3 a q1 sin volver a minimizar todo el autómata
+        dfa = CompiledDFA(['q0', 'q1', 'q2', 'q3'], ['a'], array('i', [1, 0, 3, 3]),
+                          bytearray([1, 0, 1, 0]), 0)
+        minimizer = IncrementalMinimizer(dfa)
+        minimizer.set_transition('q3', 'a', 'q2')
+        self.assertTrue(minimizer.equivalent('q0', 'q2'))
+        self.assertTrue(minimizer.equivalent('q1', 'q3'))
+        self.assertEqual((minimizer.full_runs, minimizer.local_updates), (1, 1))
+        self.assertPartition(minimizer)
+
+    def test_edit_is_local(self):
+        # Árbol binario completo: cada estado solo se alcanza desde sus antepasados,
+        # así que cerrar un ciclo en una hoja solo recoloca unos pocos estados
+        n = 2 ** 12 - 1
+        transitions = array('i', [t if t < n else n for q in range(n) for t in (2 * q + 1, 2 * q + 2)] + [n, n])
+        final = bytearray(2 * q + 1 >= n for q in range(n)) + bytearray(1)
+        dfa = CompiledDFA(['q%d' % q for q in range(n)] + ['q_error'], ['a', 'b'], transitions, final, 0, n)
+        minimizer = IncrementalMinimizer(dfa)
+        minimizer.set_transition('q%d' % (n - 1), 'a', 'q%d' % ((n - 2) // 2))
+        self.assertEqual((minimizer.full_runs, minimizer.local_updates), (1, 1))
+        self.assertLess(minimizer.visited, 20)
+        self.assertPartition(minimizer)
+
+    def test_large_closure_runs_hopcroft(self):
+        # En un autómata aleatorio casi todos los estados llegan al editado
+        rng = random.Random(0)
+        n = 5000
+        dfa = CompiledDFA(['q%d' % q for q in range(n)], ['a', 'b'],
+                          array('i', [rng.randrange(n) for _ in range(2 * n)]),
+                          bytearray(rng.random() < 0.5 for _ in range(n)), 0)
+        minimizer = IncrementalMinimizer(dfa)
+        minimizer.set_final('q0', not minimizer.final[0])
+        self.assertEqual((minimizer.full_runs, minimizer.local_updates), (2, 0))
+        self.assertPartition(minimizer)
+
+    def test_random_edits(self):
+        rng = random.Random(0)
+        for _ in range(300):
+            # La mitad de las veces con un estado de error al que van muchas transiciones
+            minimizer = IncrementalMinimizer(random_dfa(rng, to_sink=0.4))
+            added = 0
+            for _ in range(15):
+                names = list(minimizer.state_index)
+                operation = rng.random()
+                if operation < 0.45:
+                    symbol = rng.choice(minimizer.alphabet + ['z'] if rng.random() < 0.05 else minimizer.alphabet)
+                    minimizer.set_transition(rng.choice(names), symbol, rng.choice(names + [None]))
+                elif operation < 0.7:
+                    minimizer.set_final(rng.choice(names), rng.random() < 0.5)
+                elif operation < 0.85:
+                    minimizer.add_state('n%d' % added, rng.random() < 0.5)
+                    added += 1
+                else:
+                    removable = [q for q in names if minimizer.state_index[q] != minimizer.initial]
+                    if removable:
+                        minimizer.remove_state(rng.choice(removable))
+                self.assertPartition(minimizer)
+            self.assertEqual(minimizer.full_runs, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import random
+import unittest
+from array import array
+
+from automatons.auxiliar_classes.compiled_dfa import CompiledDFA
+from automatons.product import OPERATIONS, fold, product
+from tests.helpers import random_dfa
+
+try:
+    import numpy  # noqa: F401
+    ALGORITHMS = ('table', 'hopcroft', 'moore-numpy', 'valmari')
+except ImportError:
+    ALGORITHMS = ('table', 'hopcroft', 'valmari')
+
+
+class ProductTest(unittest.TestCase):
+
+    def test_disjoint_languages_collapse_to_sink(self):
+        # Un número impar de aes y un número par: las parejas (s1,s1) y (s2,s2)
+        # no tienen ningún componente en el estado de error, pero no aceptan nada
+        odd = CompiledDFA(['s1', 's2'], ['a', 'b'], array('i', [1, 0, 0, 1]), bytearray([0, 1]), 0)
+        even = CompiledDFA(['s1', 's2'], ['a', 'b'], array('i', [1, 0, 0, 1]), bytearray([1, 0]), 0)
+        result = product(odd, even, 'intersection')
+        self.assertEqual(result.n_states(), 1)
+        self.assertEqual(result.sink, 0)
+
+    def test_fold_engines_agree(self):
+        rng = random.Random(0)
+        for _ in range(100):
+            # Autómatas sobre {a, b}, sin estado de error explícito
+            automata = [random_dfa(rng, max_states=6, min_symbols=2, max_symbols=2, sink=0.0)
+                        for _ in range(3)]
+            for operation in OPERATIONS:
+                classes = {algorithm: fold(automata, operation, algorithm).n_classes
+                           for algorithm in ALGORITHMS}
+                self.assertEqual(len(set(classes.values())), 1, (operation, classes))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import io
+import random
+import unittest
+from array import array
+
+from jflap.Afn import Afn
+from automatons.auxiliar_classes.compiled_dfa import CompiledDFA
+from automatons.determinize import determinize
+from automatons.minimize import equivalence_classes
+from tests.helpers import random_dfa
+
+
+def _same_partition(a: tuple, b: tuple) -> bool:
+    """Devuelve si dos resultados de equivalence_classes() agrupan igual los estados"""
+    return a[1] == b[1] and len(set(zip(a[0], b[0]))) == a[1]
+
+
+def _random_nfa(rng: random.Random) -> Afn:
+    """Autómata no determinista pequeño, con transiciones lambda, en JFLAP"""
+    n = rng.randint(1, 6)
+    xml = ['<structure><type>fa</type><automaton>']
+    for q in range(n):
+        xml.append('<state id="%d" name="s%d">%s%s</state>' % (
+            q, q, '<initial/>' if q == 0 else '', '<final/>' if rng.random() < 0.2 else ''))
+    for _ in range(rng.randint(0, 3 * n)):
+        symbol = rng.choice(['a', 'b', None])
+        xml.append('<transition><from>%d</from><to>%d</to>%s</transition>' % (
+            rng.randrange(n), rng.randrange(n), '<read/>' if symbol is None else '<read>%s</read>' % symbol))
+    xml.append('</automaton></structure>')
+    return Afn(io.BytesIO(''.join(xml).encode('utf-8')))
+
+
+class ValmariDeadStatesTest(unittest.TestCase):
+    """Los estados desde los que no se llega a un final van a la clase del de error"""
+
+    def test_dead_state_joins_sink(self):
+        # q0 es final, d solo lleva a sí mismo y q_error es el estado de error
+        dfa = CompiledDFA(['q0', 'd', 'q_error'], ['a', 'b'], array('i', [1, 2, 1, 1, 2, 2]),
+                          bytearray([1, 0, 0]), 0, 2)
+        self.assertEqual(equivalence_classes(dfa, 'valmari')[1], 2)
+        self.assertTrue(_same_partition(equivalence_classes(dfa, 'valmari'),
+                                        equivalence_classes(dfa, 'hopcroft')))
+
+    def test_dead_states_without_sink(self):
+        dfa = CompiledDFA(['q0', 'd', 'e'], ['a', 'b'], array('i', [1, 2, 1, 1, 2, 1]),
+                          bytearray([1, 0, 0]), 0)
+        self.assertEqual(list(equivalence_classes(dfa, 'valmari')[0]), [0, 1, 1])
+
+    def test_agrees_with_hopcroft(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            # Pocos finales, así que suele haber estados muertos
+            dfa = random_dfa(rng, min_states=2, max_states=12, final=0.15, outputs=0.3, random_initial=True)
+            self.assertTrue(_same_partition(equivalence_classes(dfa, 'valmari'),
+                                            equivalence_classes(dfa, 'hopcroft')))
+
+    def test_determinized_nfas(self):
+        # La construcción de subconjuntos deja como estados normales los
+        # conjuntos no vacíos desde los que no se llega a un final
+        rng = random.Random(0)
+        for _ in range(200):
+            dfa = determinize(_random_nfa(rng), 'subset')
+            self.assertTrue(_same_partition(equivalence_classes(dfa, 'valmari'),
+                                            equivalence_classes(dfa, 'hopcroft')))
+
+
+if __name__ == '__main__':
+    unittest.main()